@@ -0,0 +1,309 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Managed archive root for the script. Snapshots are sharded by playlist ID and listed in a manifest.
+
+Layout of an archive root :
+    <root>/manifest.json
+    <root>/<shard>/<playlist_id>/<YYYY-MM-DD_HH-MM-SS>_<fingerprint>.csv
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import io
+import os
+import json
+import hashlib
+import contextlib
+from datetime import datetime
+
+# Should be safe as long as the script is distributed as a zipapp
+import diff
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# ------------------------------------- . ------------------------------------ #
+
+
+MANIFEST_NAME = "manifest.json"
+# Held while the manifest is being updated, so that concurrent dumps into the same root don't drop each other's entries
+MANIFEST_LOCK_NAME = ".manifest.lock"
+# Bump this whenever the layout of the manifest changes
+MANIFEST_VERSION = 1
+
+
+def fingerprint(body: str) -> str:
+    """Fingerprint the CSV data of an archive (i.e. everything below the CSV header).
+
+    Two snapshots with the same fingerprint hold exactly the same videos, regardless of when they were made.
+
+    Args:
+        body (str): CSV data of the archive.
+
+    Returns:
+        str: Fingerprint of the data, e.g. `sha256:0123...`.
+    """
+    return "sha256:" + hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def write_atomic(path: str, content: str):
+    """Write `content` to `path` so that a crash never leaves a truncated file behind.
+
+    The content goes to a temporary file in the same directory, which is flushed to the disk and then renamed over `path`.
+    Readers see either the previous file or the new one, never anything in between.
+
+    Args:
+        path (str): Path to the file.
+        content (str): Text to write.
+    """
+    temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+    # The rename itself only survives a power loss once the directory is synced (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _shard(playlist_id: str) -> str:
+    """Name of the shard (sub-directory of the root) where snapshots of `playlist_id` belong.
+
+    Args:
+        playlist_id (str): YouTube ID of the playlist.
+
+    Returns:
+        str: Two hex characters, so that the root never holds more than 256 sub-directories.
+    """
+    return hashlib.sha1(playlist_id.encode("utf-8")).hexdigest()[:2]
+
+
+def load_manifest(root: str) -> dict:
+    """Load the manifest of an archive root.
+
+    Args:
+        root (str): Path to the archive root.
+
+    Returns:
+        dict: The manifest, or an empty one if the root hasn't been used yet.
+    """
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "playlists": {}}
+
+
+@contextlib.contextmanager
+def _locked(root: str):
+    """Hold an exclusive lock on the manifest of an archive root, across processes.
+
+    Args:
+        root (str): Path to the archive root.
+    """
+    with open(os.path.join(root, MANIFEST_LOCK_NAME), "a+") as f:
+        f.seek(0)
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            # Retries for 10 seconds, then raises `OSError`
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _save_manifest(root: str, manifest: dict):
+    """Write the manifest of an archive root to the disk.
+
+    Args:
+        root (str): Path to the archive root.
+        manifest (dict): The manifest.
+    """
+    write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False, indent=1))
+
+
+def store(root: str, strio: io.StringIO) -> str:
+    """Store a freshly dumped archive in the archive root, and register it in the manifest.
+
+    The manifest is read and written again under a lock, so that dumps running at the same time into the same root all
+    get registered. A snapshot identical to one already stored (same date, same videos) isn't stored twice.
+
+    Args:
+        root (str): Path to the archive root, created if needed.
+        strio (io.StringIO): The archive, as returned by `dump.dump`.
+
+    Returns:
+        str: Path of the stored snapshot.
+    """
+    strio.seek(0)
+    header = diff.read_header(strio)
+    body = strio.read()
+
+    playlist_id = header["playlist_id"]
+    save_date = header["save_date"]
+    print_hash = fingerprint(body)
+
+    # e.g. `ab/PLhixgUqwRTjwvBI-hmbZ2rpkAl4lutnJG`
+    relative_dir = os.path.join(_shard(playlist_id), playlist_id)
+    stamp = datetime.fromtimestamp(diff.unix_time(save_date)).strftime("%Y-%m-%d_%H-%M-%S")
+    file_name = f"{stamp}_{print_hash[7:15]}.csv"
+
+    os.makedirs(os.path.join(root, relative_dir), exist_ok=True)
+
+    with _locked(root):
+        manifest = load_manifest(root)
+        entry = manifest["playlists"].setdefault(playlist_id, {"dir": relative_dir, "snapshots": []})
+        series = entry["snapshots"]
+
+        taken = {snapshot["file"]: snapshot["fingerprint"] for snapshot in series}
+        if taken.get(file_name) == print_hash:
+            # Already there, e.g. the same dump stored twice within a second
+            return os.path.join(root, relative_dir, file_name)
+        if file_name in taken:
+            # Same second, different videos, and the short fingerprints collide : fall back on the full one
+            file_name = f"{stamp}_{print_hash[7:]}.csv"
+
+        write_atomic(os.path.join(root, relative_dir, file_name), strio.getvalue())
+
+        series.append(
+            {
+                "file": file_name,
+                "archived_on": int(save_date),
+                "rows": body.count("\n"),
+                "fingerprint": print_hash,
+            }
+        )
+        # Snapshots are nearly always appended in order, this is only a safety net
+        if (len(series) > 1) and (diff.unix_time(series[-2]["archived_on"]) > diff.unix_time(save_date)):
+            series.sort(key=lambda s: diff.unix_time(s["archived_on"]))
+
+        _save_manifest(root, manifest)
+
+    return os.path.join(root, relative_dir, file_name)
+
+
+def snapshots(root: str, playlist_id: str, manifest: dict = None) -> list[str]:
+    """List the snapshots of a playlist, oldest first.
+
+    Args:
+        root (str): Path to the archive root.
+        playlist_id (str): YouTube ID of the playlist.
+        manifest (dict, optional): Manifest of the root, loaded if not provided. Defaults to None.
+
+    Returns:
+        list[str]: Paths of the snapshots of the playlist, empty if it isn't tracked.
+    """
+    manifest = load_manifest(root) if (manifest is None) else manifest
+    entry = manifest["playlists"].get(playlist_id)
+    if entry is None:
+        return []
+
+    return [os.path.join(root, entry["dir"], snapshot["file"]) for snapshot in entry["snapshots"]]
+
+
+def latest(root: str, playlist_id: str, count: int = 1, manifest: dict = None) -> list[str]:
+    """Resolve the most recent snapshots of a playlist straight from the manifest, without scanning the disk.
+
+    Args:
+        root (str): Path to the archive root.
+        playlist_id (str): YouTube ID of the playlist.
+        count (int, optional): Number of snapshots to return. Defaults to 1.
+        manifest (dict, optional): Manifest of the root, loaded if not provided. Defaults to None.
+
+    Returns:
+        list[str]: Paths of (at most) the `count` most recent snapshots, oldest first.
+    """
+    manifest = load_manifest(root) if (manifest is None) else manifest
+    entry = manifest["playlists"].get(playlist_id)
+    if entry is None:
+        return []
+
+    return [os.path.join(root, entry["dir"], snapshot["file"]) for snapshot in entry["snapshots"][-count:]]
+
+
+def latest_ids(root: str, playlist_id: str) -> set[str] | None:
+    """YouTube IDs found in the most recent snapshot of a playlist.
+
+    Args:
+        root (str): Path to the archive root.
+        playlist_id (str): YouTube ID of the playlist.
+
+    Returns:
+        set[str] | None: The IDs, `None` if the playlist has no snapshot yet.
+    """
+    for path in latest(root, playlist_id):
+        with open(path, "r", encoding="utf-8") as f:
+            return {row[1] for row in diff.read(f)["data"]}
+
+    return None
+
+
+def every_series(archives: str, compacted: bool = False) -> dict[str, list[str]]:
+    """List the archives found in a directory, grouped by playlist, oldest first. Only their metadata is read.
+
+    Args:
+        archives (str): Directory containing the archives, searched recursively.
+        compacted (bool, optional): Whether to list compacted archives (see `compact`) too. They span many snapshots, so they aren't snapshots themselves. Defaults to False.
+
+    Returns:
+        dict[str, list[str]]: Playlist IDs as keys, and the paths of their archives as values.
+    """
+    dated = {}
+    for dir_path, _, file_names in os.walk(archives):
+        for file_name in file_names:
+            if not file_name.endswith(".csv"):
+                continue
+            path = os.path.join(dir_path, file_name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    header = diff.read_header(f)
+                if ("compacted" in header) and (not compacted):
+                    continue
+                dated.setdefault(header["playlist_id"], []).append(
+                    (diff.unix_time(header["save_date"]), path)
+                )
+            except (OSError, UnicodeDecodeError, KeyError, ValueError):
+                continue
+
+    return {playlist_id: [path for (_, path) in sorted(paths)] for playlist_id, paths in dated.items()}
+
+
+def series(archives: str, playlist_id: str, compacted: bool = False) -> list[str]:
+    """List the archives of a playlist found in a directory, oldest first. See `every_series`.
+
+    Args:
+        archives (str): Directory containing the archives, searched recursively.
+        playlist_id (str): YouTube ID of the playlist.
+        compacted (bool, optional): Whether to list compacted archives too. Defaults to False.
+
+    Returns:
+        list[str]: Paths of the archives of the playlist.
+    """
+    return every_series(archives, compacted=compacted).get(playlist_id, [])
+
+
+# ------------------------------------- . ------------------------------------ #
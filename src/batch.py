@@ -0,0 +1,242 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Batch diff for the script. The two latest snapshots of many playlists --> what moved where.
+
+Diffing one playlist at a time can't tell a video that moved to another playlist from one that was removed. Here, every
+snapshot goes through a single index, YouTube ID --> playlists the video was in before and after, and each video is
+then classified once :
+    * "move" : left some playlists, and joined others.
+    * "copy" : joined some playlists, and stayed in the ones it was in.
+    * "removal" : left some playlists, and didn't join any.
+    * "loss" : stayed in a playlist, but went unavailable there.
+    * "addition" : joined some playlists, and wasn't in any before.
+Both building the index and classifying take time linear in the total number of rows, however many playlists there are.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import csv
+import json
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import loader
+
+# Safe, provided previous blocks ran.
+from colorama import Fore
+
+try:
+    from enum import Enum
+except ModuleNotFoundError:
+    print(txt.enum_import_error)
+    txt.error_handler()
+
+try:
+    import prettytable as pt
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`prettytable`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Columns of the CSV export
+CHANGE_COLUMNS = ["kind", "id", "title", "channel", "from", "to"]
+
+
+class Change(Enum):
+    """See the module docstring. Variants are listed in the order changes are reported."""
+
+    MOVE = "move"
+    COPY = "copy"
+    REMOVAL = "removal"
+    LOSS = "loss"
+    ADDITION = "addition"
+
+
+# Colour of each kind of change, in tables
+COLORS = {
+    Change.MOVE: Fore.CYAN,
+    Change.COPY: Fore.BLUE,
+    Change.REMOVAL: Fore.WHITE,
+    Change.LOSS: Fore.RED,
+    Change.ADDITION: Fore.GREEN,
+}
+
+
+def _metadata(archives: list["loader.Columns"], rows: list[tuple[int, int]]) -> tuple[str | None, str | None]:
+    """Title and channel of a video, from the first of its rows where it was available.
+
+    Args:
+        archives (list[loader.Columns]): Every snapshot, see `classify`.
+        rows (list[tuple[int, int]]): Snapshot number and row of each occurrence of the video.
+
+    Returns:
+        tuple[str | None, str | None]: The title and channel, `None` if the video was never available.
+    """
+    for k, i in rows:
+        if not archives[k].unavailable[i]:
+            row = archives[k].row(i)
+            return (row[5], row[3])
+
+    return (None, None)
+
+
+def classify(pairs: dict[str, list[str]], jobs: int = None) -> tuple[list[dict], int]:
+    """Diff many playlists at once.
+
+    Args:
+        pairs (dict[str, list[str]]): Playlist IDs as keys, and paths of their snapshots as values, oldest first. Only the two latest snapshots of each playlist are diffed, playlists with a single one are skipped.
+        jobs (int, optional): Number of worker processes parsing snapshots, see `loader.load`. Defaults to None, i.e. one per CPU.
+
+    Raises:
+        ValueError: If a snapshot is malformed, with its path as the only argument.
+
+    Returns:
+        tuple[list[dict], int]: The changes ("kind", "id", "title", "channel", "from" and "to", the last two being lists of playlist IDs), grouped by kind, and the number of rows read.
+    """
+    playlists = sorted(playlist_id for (playlist_id, paths) in pairs.items() if len(paths) >= 2)
+    paths = [path for playlist_id in playlists for path in pairs[playlist_id][-2:]]
+
+    # Snapshot `2 * p` is the base of playlist `p`, `2 * p + 1` the one it's diffed with
+    archives = []
+    # YouTube ID --> ([(snapshot, row), ...] before, [(snapshot, row), ...] after)
+    videos = {}
+    rows = 0
+    loaded = loader.load(paths, jobs=jobs, strict=True)
+    for k, path in enumerate(paths):
+        try:
+            columns = next(loaded)
+        except (ValueError, csv.Error) as e:
+            raise ValueError(path) from e
+        archives.append(columns)
+        side = k % 2
+        for i, video_id in enumerate(columns.ids()):
+            occurrences = videos.get(video_id)
+            if occurrences is None:
+                occurrences = videos[video_id] = ([], [])
+            occurrences[side].append((k, i))
+        rows += len(columns)
+
+    changes = {kind: [] for kind in Change}
+    for video_id, (before, after) in videos.items():
+        was = {k // 2 for (k, _) in before}
+        now = {k // 2 for (k, _) in after}
+        left = sorted(was - now)
+        joined = sorted(now - was)
+
+        kind = None
+        origin = left
+        if (len(left) > 0) and (len(joined) > 0):
+            kind = Change.MOVE
+        elif len(joined) > 0:
+            kind = Change.COPY if (len(was) > 0) else Change.ADDITION
+            origin = sorted(was)
+        elif len(left) > 0:
+            kind = Change.REMOVAL
+
+        if kind is not None:
+            title, channel = _metadata(archives, after + before)
+            changes[kind].append(
+                {
+                    "kind": kind.value,
+                    "id": video_id,
+                    "title": title,
+                    "channel": channel,
+                    "from": [playlists[p] for p in origin],
+                    "to": [playlists[p] for p in joined],
+                }
+            )
+
+        # Playlists the video stayed in, available before and unavailable after
+        available = {k // 2 for (k, i) in before if not archives[k].unavailable[i]}
+        lost = sorted({k // 2 for (k, i) in after if archives[k].unavailable[i] and (k // 2 in available)})
+        if len(lost) > 0:
+            title, channel = _metadata(archives, before)
+            changes[Change.LOSS].append(
+                {
+                    "kind": Change.LOSS.value,
+                    "id": video_id,
+                    "title": title,
+                    "channel": channel,
+                    "from": [playlists[p] for p in lost],
+                    "to": [],
+                }
+            )
+
+    return ([change for kind in Change for change in changes[kind]], rows)
+
+
+def export(changes: list[dict], path: str) -> str:
+    """Export the output of `classify`.
+
+    Args:
+        changes (list[dict]): Output of `classify`.
+        path (str): Destination. A `.json` path gets a JSON file, any other path a CSV file (playlist IDs separated by spaces).
+
+    Returns:
+        str: Path of the file written.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            json.dump(changes, f, ensure_ascii=False, indent=1)
+            return path
+
+        writer = csv.DictWriter(f, fieldnames=CHANGE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(
+            {**change, "from": " ".join(change["from"]), "to": " ".join(change["to"])} for change in changes
+        )
+
+    return path
+
+
+def summary(changes: list[dict]):
+    """Print the output of `classify`. Additions are only counted.
+
+    Args:
+        changes (list[dict]): Output of `classify`.
+    """
+    counts = {kind: 0 for kind in Change}
+    for change in changes:
+        counts[Change(change["kind"])] += 1
+
+    count_table = pt.PrettyTable(padding_width=3)
+    count_table.set_style(pt.SINGLE_BORDER)
+    count_table.field_names = [txt.header_change, txt.header_count]
+    for kind, count in counts.items():
+        count_table.add_row([COLORS[kind] + kind.value + txt.RS, count])
+    print(count_table)
+
+    detailed = [change for change in changes if change["kind"] != Change.ADDITION.value]
+    if len(detailed) == 0:
+        return
+
+    table = pt.PrettyTable(padding_width=3)
+    table.set_style(pt.SINGLE_BORDER)
+    table.field_names = [
+        txt.header_change,
+        txt.header_yt_id,
+        txt.header_title,
+        txt.header_channel,
+        txt.header_from,
+        txt.header_to,
+    ]
+    table.align = "l"
+    for change in detailed:
+        table.add_row(
+            [
+                COLORS[Change(change["kind"])] + change["kind"] + txt.RS,
+                change["id"],
+                change["title"] or "",
+                change["channel"] or "",
+                "\n".join(change["from"]),
+                "\n".join(change["to"]),
+            ]
+        )
+    print(table)
+
+
+# ------------------------------------- . ------------------------------------ #
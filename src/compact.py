@@ -0,0 +1,120 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Compaction service for the script. A series of snapshots of a playlist --> one archive holding every video ever seen.
+
+The compacted archive is a regular archive with three more columns, so that it can be used as `diff_base` as is :
+    * "firstSeen" / "lastSeen" : unix time (ms) of the first and last snapshots the video was found in.
+    * "lastAvailable" : unix time (ms) of the last snapshot the video was available in, empty if it never was.
+The metadata of each video is taken from `lastAvailable`, hence `isUnavailable` is only `True` for videos that never were available.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import io
+import csv
+
+# Should be safe as long as the script is distributed as a zipapp
+import diff
+import dump
+import archive
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Columns added to the CSV header of compacted archives
+CSV_HEADER_EXTENSION = ", firstSeen, lastSeen, lastAvailable"
+
+
+def _seen(row: list[str], date: int, compacted: bool) -> tuple[int, int, int | None]:
+    """When a video was seen, according to one archive.
+
+    Args:
+        row (list[str]): The video, as parsed by `diff.read`.
+        date (int): Unix time (ms) of the archive.
+        compacted (bool): Whether the archive is itself a compacted archive, which carries its own dates.
+
+    Returns:
+        tuple[int, int, int | None]: First seen, last seen and last available unix times (ms).
+    """
+    if compacted:
+        return (int(row[6]), int(row[7]), int(row[8]) if (row[8] != "") else None)
+
+    return (date, date, date if (row[2] == "False") else None)
+
+
+def compact(paths: list[str]) -> io.StringIO:
+    """Merge a series of archives of the same playlist in a single streaming pass.
+
+    Args:
+        paths (list[str]): Paths of the archives, oldest first (see `archive.series` and `archive.snapshots`). Previously compacted archives are accepted too, so that new snapshots can be folded in later on.
+
+    Raises:
+        ValueError: If an archive is malformed, with its path as the only argument.
+
+    Returns:
+        io.StringIO: The compacted archive. Videos still in the playlist come first in playlist order, then the others, most recently seen first.
+    """
+    # YouTube ID --> [index, first seen, last seen, last available, `dump.Entry`]
+    videos = {}
+    playlist_id = None
+    first_date = None
+    last_date = None
+
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                header = diff.read_header(f)
+                playlist_id = header["playlist_id"]
+                date = int(diff.unix_time(header["save_date"]) * 1000)
+                compacted = "compacted" in header
+                first_date = min(first_date or date, int(header.get("first_archived", date)))
+                last_date = max(last_date or date, date)
+
+                for row in csv.reader(f, delimiter=",", skipinitialspace=True):
+                    if len(row) < 6:
+                        continue
+                    first, last, available = _seen(row, date, compacted)
+
+                    known = videos.get(row[1])
+                    if known is None:
+                        videos[row[1]] = [int(row[0]), first, last, available, dump.Entry.from_row(row)]
+                        continue
+
+                    known[1] = min(known[1], first)
+                    if last >= known[2]:
+                        known[0], known[2] = int(row[0]), last
+                    # Unavailable rows carry no metadata, the most recent available one wins
+                    if (available is not None) and ((known[3] is None) or (available >= known[3])):
+                        known[3], known[4] = available, dump.Entry.from_row(row)
+        except (KeyError, IndexError, ValueError, csv.Error) as e:
+            raise ValueError(path) from e
+
+    # Still in the playlist first (in order), then the most recently removed
+    ordered = sorted(videos.values(), key=lambda video: (-video[2], video[0]))
+
+    body = io.StringIO()
+    for index, first, last, available, entry in ordered:
+        entry.unavailable = available is None
+        extension = f", {first}, {last}, {available if (available is not None) else ''}"
+        body.write(dump._format_row(index, entry, extension))
+
+    strio = io.StringIO()
+    strio.write(
+        f"""Playlist ID : {playlist_id}\n"""
+        + f"""Archived on : {last_date}\n"""
+        + f"""First archived : {first_date}\n"""
+        + f"""Compacted : {len(paths)}\n"""
+        + f"""Rows : {len(ordered)}\n"""
+        + f"""Checksum : {archive.fingerprint(body.getvalue())}\n"""
+        + dump.CSV_HEADER[:-1]
+        + CSV_HEADER_EXTENSION
+        + "\n"
+    )
+    strio.write(body.getvalue())
+
+    return strio
+
+
+# ------------------------------------- . ------------------------------------ #
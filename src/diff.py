@@ -53,6 +53,33 @@ def _poll() -> bool:
     return True if (str.lower(user_input) == "y") else False
 
 
+# Metadata keys that don't follow the naming convention of `read_header`
+HEADER_KEYS = {"Archived on": "save_date"}
+# Start of the CSV header, which marks the end of the metadata
+CSV_HEADER = "index, id"
+
+
+def read_header(file: io.StringIO | io.TextIOWrapper) -> dict:
+    """Reads the metadata at the top of an archive, and leaves `file` right where the CSV data begins.
+
+    Args:
+        file (io.StringIO | io.TextIOWrapper): The archive as a text file/object.
+
+    Returns:
+        dict: Dictionary with one entry per `Key : value` metadata line, e.g. `Playlist ID : ...` becomes "playlist_id" (and `Archived on : ...` becomes "save_date").
+    """
+    out = {}
+
+    for line in file:
+        # Do not include the header in the csv being read
+        if line.startswith(CSV_HEADER):
+            break
+        key, _, value = line.rstrip("\n").partition(" : ")
+        out[HEADER_KEYS.get(key, key.lower().replace(" ", "_"))] = value
+
+    return out
+
+
 def read(file: io.StringIO | io.TextIOWrapper) -> dict:
     """Reads CSV archives in the `yt-playlist-diff` format
 
@@ -63,27 +90,35 @@ def read(file: io.StringIO | io.TextIOWrapper) -> dict:
         dict: Dictionary representing the archive in the following format :
                 * "playlist_id" (str): YouTube ID of the playlist.
                 * "save_date" (str): Unix timestamp at which the archive was made.
+                * Any other metadata found by `read_header`.
                 * "data" (list[list]): List containing all videos and their metadata,
                                      each video is a list, check csv header for more
                                      information.
     """
 
-    # Output
-    out = {}
-
-    reader = csv.reader(file, delimiter=",", skipinitialspace=True)
-
     # Metadata
-    out["playlist_id"] = next(file)[14:-1]
-    out["save_date"] = next(file)[14:-1]
+    out = read_header(file)
 
     # Data
-    next(file)  # Do not include the header in the csv being read
+    reader = csv.reader(file, delimiter=",", skipinitialspace=True)
     out["data"] = list(reader)
 
     return out
 
 
+def unix_time(save_date: str) -> float:
+    """Converts the `save_date` of an archive to a unix timestamp in seconds.
+
+    Args:
+        save_date (str): Unix timestamp as found in the archive, either in seconds or milliseconds.
+
+    Returns:
+        float: Unix timestamp in seconds.
+    """
+    # Accommodate for unix time in seconds or milliseconds.
+    return int(save_date) / 1000 if (len(str(int(save_date))) >= 13) else int(save_date)
+
+
 def _checkup(old_archive: dict, new_archive: dict) -> CheckupResult:
     """Check whether the archives provided are compatible, i.e. they are of the same playlist (same ID), and they are provided in the right chronological order.
 
@@ -97,17 +132,8 @@ def _checkup(old_archive: dict, new_archive: dict) -> CheckupResult:
     # Fallback output
     out = CheckupResult.PASS
 
-    # Accommodate for unix time in seconds or milliseconds.
-    new_pl_unix_time = (
-        int(new_archive["save_date"]) / 1000
-        if (len(str(int(new_archive["save_date"]))) >= 13)
-        else int(new_archive["save_date"])
-    )
-    old_pl_unix_time = (
-        int(old_archive["save_date"]) / 1000
-        if (len(str(int(old_archive["save_date"]))) >= 13)
-        else int(old_archive["save_date"])
-    )
+    new_pl_unix_time = unix_time(new_archive["save_date"])
+    old_pl_unix_time = unix_time(old_archive["save_date"])
 
     print(txt.checkup_section)
     print(
@@ -155,6 +181,46 @@ def _collect(playlist: dict) -> dict:
     return lost_ids
 
 
+def _index(playlist: dict) -> dict:
+    """Index the videos of an archive by YouTube ID.
+
+    Args:
+        playlist (dict): Dictionary of the archive.
+
+    Returns:
+        dict: Dictionary with YouTube IDs as keys, and the position of their first occurrence in `playlist["data"]` as values.
+    """
+    out = {}
+
+    for idx, row in enumerate(playlist["data"]):
+        out.setdefault(row[1], idx)
+
+    return out
+
+
+def _lookup(playlist: dict, index: dict, lost: str, yt_index: str) -> list:
+    """Look up one lost video in an archive, see `_compare`.
+
+    Args:
+        playlist (dict): Dictionary of the archive to compare against.
+        index (dict): Index of `playlist`, as built by `_index`.
+        lost (str): YouTube ID of the lost video.
+        yt_index (str): Index of the video in the newest version of the playlist.
+
+    Returns:
+        list: Either `[yt_index, False]`, `[yt_index, True]` or `[yt_index, metadata]`, see `_compare`.
+    """
+    idx = index.get(lost)
+
+    # No corresponding video has been found in the playlist
+    if idx is None:
+        return [yt_index, False]
+
+    row = playlist["data"][idx]
+    # Register found data only if `available`
+    return [yt_index, row] if (row[2] == "False") else [yt_index, True]
+
+
 def _compare(playlist: dict, lost_ids: dict) -> dict:
     """Checks the archive for sought-after YouTube video IDs, in the hope of finding the corresponding metadata.
 
@@ -165,26 +231,27 @@ def _compare(playlist: dict, lost_ids: dict) -> dict:
     Returns:
         dict: Dictionary with lost IDs as keys, and either `[yt_index, False]` (if no metadata was found), `[yt_index, True]` (if lost metadata was found) or [yt_index, metadata] as values ; where `yt_index` is the index of the video in the newest version of the playlist.
     """
-    # Output
-    out = {}
-    # List of lists containing all videos and their metadata
-    data = playlist["data"]
-    # Column containing all the YouTube IDs of the videos in the archive
-    ids = [row[1] for row in data]
-
-    for lost in lost_ids.keys():
-        try:
-            # Find the index of the current ID in the playlist
-            index = ids.index(lost)
-            # Register found data only if `available`
-            out[lost] = (
-                [lost_ids[lost], data[index]] if (data[index][2] == "False") else [lost_ids[lost], True]
-            )
-        # No corresponding video has been found in the playlist
-        except:
-            out[lost] = [lost_ids[lost], False]
+    index = _index(playlist)
 
-    return out
+    return {lost: _lookup(playlist, index, lost, yt_index) for (lost, yt_index) in lost_ids.items()}
+
+
+def _fallback(recovered: dict, fallback: dict) -> dict:
+    """Fills the gaps left by `compare` using metadata from another source, e.g. the knowledge base built by `kb.build`.
+
+    Args:
+        recovered (dict): Dictionary generated by `compare`.
+        fallback (dict): Dictionary with YouTube IDs as keys and available archive rows as values.
+
+    Returns:
+        dict: `recovered`, where IDs that could not be recovered from the base archive now hold the fallback metadata if any was found.
+    """
+    for lost, (yt_index, found) in recovered.items():
+        # Only look up videos the base archive couldn't help with
+        if (type(found) is bool) and (lost in fallback):
+            recovered[lost] = [yt_index, fallback[lost]]
+
+    return recovered
 
 
 def _analyse(recovered: dict):
@@ -314,27 +381,45 @@ def _analyse(recovered: dict):
 # ---------------------------------------------------------------------------- #
 
 
-def diff(diff_base: dict, diff_with: dict):
+def diff(diff_base: dict, diff_with: dict, fallback: dict = None, recovered: dict = None) -> dict | None:
+    """Diff two archives and print out the results.
+
+    Args:
+        diff_base (dict): Dictionary of the oldest archive, as returned by `read`.
+        diff_with (dict): Dictionary of the newest archive, as returned by `read`. Only its metadata is needed if `recovered` is provided.
+        fallback (dict, optional): Additional metadata source for videos missing from `diff_base`, see `kb.fallback`. Defaults to None.
+        recovered (dict, optional): Lost videos already looked up in `diff_base`, in the format of `_compare` (see `pipeline.Classifier`). Defaults to None, i.e. look them up here.
+
+    Returns:
+        dict | None: The lost videos, in the format of `_compare` (fallback included), `None` if the user chose to abort.
+    """
     # Check files metadata for compatibility
     result = _checkup(diff_base, diff_with)
 
     # If everything is fine
     if result == CheckupResult.PASS:
-        # Find all lost videos in the newest archive
-        lost_ids = _collect(diff_with)
+        if recovered is None:
+            # Find all lost videos in the newest archive
+            lost_ids = _collect(diff_with)
+            # Fetch the corresponding metadata from the older archive
+            recovered = _compare(diff_base, lost_ids) if (len(lost_ids) > 0) else {}
 
         # If videos were lost
-        if len(lost_ids) > 0:
-            # Fetch the corresponding metadata from the older archive
-            recovered = _compare(diff_base, lost_ids)
+        if len(recovered) > 0:
+            # Try our luck with other archives for whatever is still missing
+            if fallback is not None:
+                recovered = _fallback(recovered, fallback)
             # Analyse, match and print out the results
             _analyse(recovered)
         # Else, nothing was lost
         else:
             print("\n" + txt.result_allgood)
+
+        return recovered
     # Else, a problem was found and user chose to abort.
     else:
         print(txt.message_script_terminated.format(result=result))
+        return None
 
 
 # ------------------------------------- . ------------------------------------ #
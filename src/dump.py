@@ -8,11 +8,23 @@ Dump service for the script. YouTube playlists --> CSV.
 # ---------------------------------------------------------------------------- #
 
 import io
+import os
+import csv
 import time
+import json
+import functools
+import itertools
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Should be safe as long as the script is distributed as a zipapp
 import misc_text as txt
+import diff
+import enrich
+import archive
+import metrics
 
 try:
     import yt_dlp
@@ -23,45 +35,429 @@ except ModuleNotFoundError:
 # ------------------------------------- . ------------------------------------ #
 
 
-def _get_playlist_from_yt(playlist_id: str, browser: str) -> dict:
-    """Fetch the playlist using `yt_dlp`
+# Where playlists are fetched from, can be pointed at a local stand-in (see `standin`)
+SOURCE = "https://www.youtube.com"
+# `yt_dlp` extractor to use with `SOURCE`, `None` for the built-in YouTube ones
+SOURCE_IE = None
+# Paces the requests of every session (see `scheduler`), `None` to send them as fast as `yt_dlp` does
+SCHEDULER = None
+# Column names, found right above the CSV data of every archive
+CSV_HEADER = "index, id, isUnavailable, channel, channelUrl, title\n"
+# Number of entries fetched between two checkpoints
+CHUNK_SIZE = 500
+# Number of attempts at fetching a chunk before giving up
+CHUNK_RETRIES = 3
+# Seconds after which a partial file is too old to resume, the playlist has likely changed in the meantime
+CHECKPOINT_MAX_AGE = 6 * 3600
+# Number of playlists fetched concurrently in channel mode
+CHANNEL_JOBS = 4
+# Number of consecutive videos that have to match the base archive before a refresh stops fetching
+REFRESH_RUN = 25
+# A refresh fetches the whole playlist again after that many incremental refreshes in a row
+REFRESH_VERIFY_EVERY = 10
+# A video that is for some reason not available to play should have that thumbnail
+NO_THUMBNAIL = "https://i.ytimg.com/img/no_thumbnail.jpg"
+
+
+class Entry:
+    """Compact record of a playlist entry, holding only what ends up in the archive.
+
+    `yt_dlp` entries carry thumbnail lists, URLs and many other fields we never use, so each of them is projected
+    onto one of these as soon as it's produced, and the raw dictionary is dropped.
+    """
+
+    __slots__ = ("id", "unavailable", "channel", "channel_url", "title")
+
+    def __init__(self, id: str, unavailable: bool, channel: str, channel_url: str, title: str):
+        self.id = id
+        self.unavailable = unavailable
+        self.channel = channel
+        self.channel_url = channel_url
+        self.title = title
+
+    @classmethod
+    def from_row(cls, row: list[str]) -> "Entry":
+        """Read back a video from an archive.
+
+        Args:
+            row (list[str]): The video, as parsed by `diff.read`.
+
+        Returns:
+            Entry: The compact record.
+        """
+        return cls(row[1], row[2] == "True", row[3], row[4], row[5])
+
+    @classmethod
+    def from_info(cls, entry: dict) -> "Entry":
+        """Project a flat `yt_dlp` entry.
+
+        Args:
+            entry (dict): The `yt_dlp` information dictionary of the video, as found in the playlist.
+
+        Returns:
+            Entry: The compact record.
+        """
+        thumbnails = entry.get("thumbnails") or [{}]
+        return cls(
+            entry["id"],
+            thumbnails[0].get("url") == NO_THUMBNAIL,
+            entry.get("channel"),
+            entry.get("channel_url"),
+            entry.get("title"),
+        )
+
+
+def _ydl_opts(browser: str) -> dict:
+    """Options of the `yt_dlp` instances used for fetching playlists.
 
     Args:
-        playlist_id (str): YouTube ID of the playlist (e.g. PLhixgUqwRTjwvBI-hmbZ2rpkAl4lutnJG)
         browser (str): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23
 
     Returns:
-        dict: The information dictionary of the playlist.
+        dict: The options.
     """
     ydl_opts = {
         "skip_download": True,  # We don't want to download any video
         "quiet": True,  # No need to be verbose
-        "extract_flat": True,  # I don't remember what that is, better leave it like that
-        "playlist_items": "1-5000",  # A playlist can (as of yet) not contain more than 5000 videos, this is a YouTube limitation
     }
 
     if browser is not None:
         ydl_opts["cookiesfrombrowser"] = (browser,)
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        playlist_dict = ydl.extract_info(
-            f"https://www.youtube.com/playlist?list={playlist_id}", download=False
+    return ydl_opts
+
+
+def _session(browser: str) -> "yt_dlp.YoutubeDL":
+    """Open a `yt_dlp` session able to fetch playlists from `SOURCE`.
+
+    Args:
+        browser (str): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23
+
+    Returns:
+        yt_dlp.YoutubeDL: The session, to be closed by the caller.
+    """
+    ydl = yt_dlp.YoutubeDL(_ydl_opts(browser))
+    if SOURCE_IE is not None:
+        ydl.add_info_extractor(SOURCE_IE())
+    if SCHEDULER is not None:
+        SCHEDULER.install(ydl)
+
+    return ydl
+
+
+def _extract(ydl: "yt_dlp.YoutubeDL", url: str, ie_key: str = None) -> dict:
+    """Extract a playlist-like page without resolving its entries.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): The `yt_dlp` instance to use.
+        url (str): URL of the page.
+        ie_key (str, optional): Key of the extractor to use. Defaults to None, i.e. let `yt_dlp` pick one.
+
+    Returns:
+        dict: The information dictionary of the page, where "entries" is a lazy iterable that has to be consumed before `ydl` is closed.
+    """
+    # `process=False` keeps `yt_dlp` from resolving (and holding on to) every entry, we'll iterate them ourselves
+    info_dict = ydl.extract_info(url, download=False, ie_key=ie_key, process=False)
+
+    # Follow redirections between extractors, still without resolving anything
+    while info_dict.get("_type") in ("url", "url_transparent"):
+        info_dict = ydl.extract_info(
+            info_dict["url"], download=False, ie_key=info_dict.get("ie_key"), process=False
         )
 
+    return info_dict
+
+
+def _extract_video(ydl: "yt_dlp.YoutubeDL", video_id: str) -> dict:
+    """Extract the full metadata of one video, see `enrich`.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): The `yt_dlp` instance to use, see `_session`.
+        video_id (str): YouTube ID of the video.
+
+    Returns:
+        dict: The information dictionary of the video.
+    """
+    return ydl.extract_info(
+        f"{SOURCE}/watch?v={video_id}",
+        download=False,
+        ie_key=SOURCE_IE.ie_key() if (SOURCE_IE is not None) else None,
+    )
+
+
+def _extract_playlist(ydl: "yt_dlp.YoutubeDL", playlist_id: str) -> dict:
+    """Extract the playlist without resolving its entries.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): The `yt_dlp` instance to use.
+        playlist_id (str): YouTube ID of the playlist (e.g. PLhixgUqwRTjwvBI-hmbZ2rpkAl4lutnJG)
+
+    Returns:
+        dict: The information dictionary of the playlist, see `_extract`.
+    """
+    return _extract(
+        ydl,
+        f"{SOURCE}/playlist?list={playlist_id}",
+        # A stand-in URL would otherwise be picked up by the generic extractor
+        ie_key=SOURCE_IE.ie_key() if (SOURCE_IE is not None) else None,
+    )
+
+
+def checkpoint_path(playlist_id: str, directory: str) -> str:
+    """Where to checkpoint a dump in progress.
+
+    Args:
+        playlist_id (str): YouTube ID of the playlist.
+        directory (str): Directory the finished archive is headed to.
+
+    Returns:
+        str: Path of the partial file.
+    """
+    return os.path.join(directory, f".{playlist_id}.partial")
+
+
+def _load_checkpoint(checkpoint: str, playlist_id: str) -> list[Entry]:
+    """Read back the entries saved by an interrupted dump.
+
+    Args:
+        checkpoint (str): Path of the partial file, see `checkpoint_path`.
+        playlist_id (str): YouTube ID of the playlist, partial files of other playlists are ignored.
+
+    Returns:
+        list[Entry]: Entries of every completed chunk, empty if there is nothing to resume. Partial files older than `CHECKPOINT_MAX_AGE` are deleted instead.
+    """
+    try:
+        with open(checkpoint, "r", encoding="utf-8") as f:
+            header = diff.read_header(f)
+            if header.get("playlist_id") != playlist_id:
+                return []
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+
+    # Saved entries are spliced back by position, which only holds if the playlist hasn't changed since
+    try:
+        age = time.time() - diff.unix_time(header["started_on"])
+    except (KeyError, ValueError):
+        age = None
+    if (age is None) or (age > CHECKPOINT_MAX_AGE):
+        print(txt.message_dump_checkpoint_stale.format(path=checkpoint))
+        os.remove(checkpoint)
+        return []
+
+    # A torn write can only ever affect the last line
+    if (len(lines) > 0) and (not lines[-1].endswith("\n")):
+        lines.pop()
+
+    return [Entry.from_row(row) for row in csv.reader(lines, delimiter=",", skipinitialspace=True)]
+
+
+def remove_checkpoint(checkpoint: str):
+    """Delete the partial file of a dump, once its archive is safely written.
+
+    Args:
+        checkpoint (str): Path of the partial file, see `checkpoint_path`.
+    """
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+
+def _save_checkpoint(checkpoint: str, playlist_id: str, entries: list[Entry], start: int):
+    """Append a completed chunk to the partial file.
+
+    Args:
+        checkpoint (str): Path of the partial file, see `checkpoint_path`.
+        playlist_id (str): YouTube ID of the playlist.
+        entries (list[Entry]): Entries of the chunk.
+        start (int): Playlist index of the first entry of the chunk.
+    """
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        # Fresh partial file, give it a header so that it can be matched with its playlist, and told apart from a stale one
+        if f.tell() == 0:
+            f.write(
+                f"""Playlist ID : {playlist_id}\n"""
+                + f"""Started on : {int(time.time() * 1000)}\n"""
+                + CSV_HEADER
+            )
+        f.write("".join(_format_row(i, entry) for i, entry in enumerate(entries, start=start)))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _get_playlist_from_yt(
+    playlist_id: str,
+    browser: str,
+    chunk_size: int = CHUNK_SIZE,
+    checkpoint: str = None,
+    known: list[list[str]] = None,
+    ydl: "yt_dlp.YoutubeDL" = None,
+    on_entry=None,
+    fatal: bool = True,
+) -> dict:
+    """Fetch the playlist using `yt_dlp`
+
+    Entries are pulled lazily from `yt_dlp` and projected onto `Entry` records one at a time, so that the raw
+    information dictionaries never pile up in memory. They are fetched in chunks of `chunk_size` : each chunk is
+    retried on failure, and saved to `checkpoint` once complete so that an interrupted dump can pick up where it
+    left off. The partial file is left behind, it's up to the caller to `remove_checkpoint` once the archive is written.
+
+    If `known` rows are provided, fetching stops as soon as `REFRESH_RUN` consecutive videos match a run of
+    `known`, and the rest of the playlist is assumed to be the rest of `known`. That only holds for playlists growing at
+    the head : the run has to come after at least one new video, and the number of videos YouTube reports has to add up.
+    Otherwise (e.g. videos appended at the tail, or no count reported), the rest of the playlist is fetched.
+
+    Args:
+        playlist_id (str): YouTube ID of the playlist (e.g. PLhixgUqwRTjwvBI-hmbZ2rpkAl4lutnJG)
+        browser (str): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23
+        chunk_size (int, optional): Number of entries per chunk. Defaults to `CHUNK_SIZE`.
+        checkpoint (str, optional): Path of the partial file, see `checkpoint_path`. Defaults to None, i.e. no checkpointing.
+        known (list[list[str]], optional): Rows of a previous archive of the playlist, as parsed by `diff.read`. Defaults to None, i.e. fetch everything.
+        ydl (yt_dlp.YoutubeDL, optional): Session to fetch with, left open. Defaults to None, i.e. use a new one (and `browser`).
+        on_entry (callable, optional): Called with the playlist index (starting at 1) and the `Entry` of each video as soon as it's known, e.g. to start diffing before the fetch is over (see `pipeline`). Entries of a chunk that is retried are reported again. Defaults to None.
+        fatal (bool, optional): Whether running out of retries should end the script. Otherwise the last `yt_dlp.utils.YoutubeDLError` is raised, for the caller to carry on with other playlists. Defaults to True.
+
+    Returns:
+        dict: The information dictionary of the playlist, where "entries" is a list of `Entry`, and "reused" the number of entries taken from `known`.
+    """
+    started = time.perf_counter()
+    entries = _load_checkpoint(checkpoint, playlist_id) if (checkpoint is not None) else []
+    if len(entries) > 0:
+        print(txt.message_dump_resuming.format(count=len(entries)))
+        if on_entry is not None:
+            for i, entry in enumerate(entries, start=1):
+                on_entry(i, entry)
+
+    # Position of each video in `known`, first occurrence only
+    known_positions = {}
+    for position, row in enumerate(known or []):
+        known_positions.setdefault(row[1], position)
+    # Where the rest of the playlist can be found in `known`, once a long enough run has matched
+    reuse_from = None
+    # Whether a video `known` doesn't have came first, i.e. the playlist grew at the head
+    fresh = any(entry.id not in known_positions for entry in entries)
+    # Only warn once that the playlist doesn't line up
+    warned = False
+
+    attempt = 0
+    with _session(browser) if (ydl is None) else contextlib.nullcontext(ydl) as ydl:
+        while True:
+            try:
+                playlist_dict = _extract_playlist(ydl, playlist_id)
+                chunk = []
+                # Length and end of the current run of videos matching `known`
+                run, previous = 0, None
+
+                # Playlist pages can only be walked from the start, skip whatever is already there
+                for entry in itertools.islice(playlist_dict.get("entries") or [], len(entries), None):
+                    chunk.append(Entry.from_info(entry))
+                    if on_entry is not None:
+                        on_entry(len(entries) + len(chunk), chunk[-1])
+
+                    position = known_positions.get(chunk[-1].id)
+                    if position is None:
+                        run = 0
+                        fresh = True
+                    elif (run > 0) and (position == previous + 1):
+                        run += 1
+                    else:
+                        run = 1
+                    previous = position
+
+                    # Nothing new past this point, the remaining pages are already in `known`
+                    if run == REFRESH_RUN:
+                        count = playlist_dict.get("playlist_count")
+                        fetched = len(entries) + len(chunk)
+                        if fresh and (count is not None) and (count == fetched + len(known) - (position + 1)):
+                            reuse_from = position + 1
+                            break
+                        if not warned:
+                            print(txt.message_dump_refresh_tail)
+                            warned = True
+
+                    if len(chunk) == chunk_size:
+                        if checkpoint is not None:
+                            _save_checkpoint(checkpoint, playlist_id, chunk, len(entries) + 1)
+                        entries.extend(chunk)
+                        chunk = []
+                        # The retry budget is per chunk
+                        attempt = 0
+                        print(txt.message_dump_chunk_fetched.format(count=len(entries)))
+
+                # Last (incomplete) chunk, no need to checkpoint it
+                entries.extend(chunk)
+                break
+
+            except yt_dlp.utils.YoutubeDLError:
+                attempt += 1
+                if attempt >= CHUNK_RETRIES:
+                    metrics.inc("failures_total", reason="fetch", playlist=playlist_id)
+                    if not fatal:
+                        raise
+                    print(txt.err_dump_fetch_failed.format(count=len(entries), retries=CHUNK_RETRIES))
+                    txt.error_handler()
+                print(txt.warn_dump_chunk_retry.format(attempt=attempt, retries=CHUNK_RETRIES))
+                time.sleep(2**attempt)
+
+    reused = 0
+    if reuse_from is not None:
+        reused = len(known) - reuse_from
+        for row in known[reuse_from:]:
+            entries.append(Entry.from_row(row))
+            if on_entry is not None:
+                on_entry(len(entries), entries[-1])
+
+    playlist_dict["entries"] = entries
+    playlist_dict["reused"] = reused
+    metrics.observe("fetch_duration_seconds", time.perf_counter() - started, playlist=playlist_id)
+
     return playlist_dict
 
 
-def _write_csv_header(playlist_dict: dict, strio: io.StringIO):
+def _write_csv_header(playlist_dict: dict, strio: io.StringIO, body: str):
     """Write the header to `output_file`, containing metadata and the CSV header
 
     Args:
         playlist_dict (dict): The `yt_dlp` information dictionary of the playlist being processed.
         output_file (str): Path to the output (csv) file
+        body (str): CSV data of the archive, which the row count and checksum are computed on (see `verify`).
     """
+    rows = body.count("\n")
+
     strio.write(
         f"""Playlist ID : {playlist_dict["id"]}\n"""
         + f"""Archived on : {int(time.time() * 1000)}\n"""
-        + """index, id, isUnavailable, channel, channelUrl, title\n"""
+        # Only for incremental refreshes, see `dump`
+        + (f"""Refreshed : {playlist_dict["refreshed"]}\n""" if ("refreshed" in playlist_dict) else "")
+        # Lets `verify` tell a complete archive from a truncated or altered one
+        + f"""Rows : {rows}\n"""
+        + f"""Checksum : {archive.fingerprint(body)}\n"""
+        # Enriched archives have a few more columns
+        + (
+            CSV_HEADER[:-1] + enrich.CSV_HEADER_EXTENSION + "\n"
+            if ("enrichment" in playlist_dict)
+            else CSV_HEADER
+        )
+    )
+
+
+def _format_row(i: int, entry: Entry, extension: str = "") -> str:
+    """Format one video as a line of CSV data.
+
+    Args:
+        i (int): Index of the video in the playlist, starting at 1.
+        entry (Entry): The video.
+        extension (str, optional): Additional columns for enriched archives, see `enrich.format_extension`. Defaults to "".
+
+    Returns:
+        str: The line, including the trailing newline.
+    """
+    return (
+        f"""{i}, """
+        + f"""{entry.id}, """
+        + f"""{entry.unavailable}, """
+        + f"""\"{entry.channel if not entry.unavailable else "Unknown channel"}\", """
+        + f"""\"{entry.channel_url if not entry.unavailable else "Unknown link"}\", """
+        + f"""\"{entry.title}\"{extension}\n"""
     )
 
 
@@ -72,39 +468,258 @@ def _write_csv_body(playlist_dict: dict, strio: io.StringIO):
         playlist_dict (dict): The `yt_dlp` information dictionary of the playlist being processed.
         output_file (str): Path to the output (csv) file
     """
+    enrichment = playlist_dict.get("enrichment")
+
     for i, entry in enumerate(playlist_dict["entries"], start=1):
-        unavailable = (
-            entry["thumbnails"][0]["url"] == "https://i.ytimg.com/img/no_thumbnail.jpg"
-        )  # A video that is for some reason not available to play should have that thumbnail
-
-        strio.write(
-            f"""{i}, """
-            + f"""{entry["id"]}, """
-            + f"""{unavailable}, """
-            + f"""\"{entry["channel"] if not unavailable else "Unknown channel"}\", """
-            + f"""\"{entry["channel_url"] if not unavailable else "Unknown link"}\", """
-            + f"""\"{entry["title"]}\"\n"""
-        )
+        extension = enrich.format_extension(enrichment.get(entry.id)) if (enrichment is not None) else ""
+        strio.write(_format_row(i, entry, extension))
 
 
 def dump(
     playlist_id: str,
     browser: str = None,
+    chunk_size: int = CHUNK_SIZE,
+    checkpoint: str = None,
+    base: dict = None,
+    verify_every: int = REFRESH_VERIFY_EVERY,
+    enrich_cache: str = None,
+    enrich_since: set[str] = None,
+    enrich_jobs: int = enrich.ENRICH_JOBS,
+    enrich_rate: float = enrich.ENRICH_RATE,
+    on_entry=None,
 ) -> tuple[io.StringIO, str]:
     """Fetch and dump the playlist into a CSV archive. Return the result.
 
     Args:
         playlist_id (str): YouTube ID of the playlist (e.g. PLhixgUqwRTjwvBI-hmbZ2rpkAl4lutnJG)
         browser (str, optional): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23. Defaults to None.
+        chunk_size (int, optional): Number of entries fetched between two checkpoints. Defaults to `CHUNK_SIZE`.
+        checkpoint (str, optional): Path of the partial file used to resume interrupted dumps, see `checkpoint_path`. Defaults to None.
+        base (dict, optional): Previous archive of the playlist as returned by `diff.read`, for an incremental refresh. Fetching stops once the videos fetched line up with `base`, and the rest is copied over. Defaults to None, i.e. fetch everything.
+        verify_every (int, optional): Maximum number of incremental refreshes in a row, the playlist is then fetched in full to catch videos that went unavailable in the copied part. Defaults to `REFRESH_VERIFY_EVERY`.
+        enrich_cache (str, optional): Path to the enrichment cache. If provided, the full metadata of new videos is fetched, and the archive gets the extended schema (duration, upload date, description). Defaults to None.
+        enrich_since (set[str], optional): YouTube IDs found in the last snapshot, these aren't new and won't be enriched. Defaults to None, i.e. every video is new.
+        enrich_jobs (int, optional): Number of videos enriched concurrently. Defaults to `enrich.ENRICH_JOBS`.
+        enrich_rate (float, optional): Maximum number of videos enriched per second. Defaults to `enrich.ENRICH_RATE`.
+        on_entry (callable, optional): Called with each video as soon as it's fetched, see `_get_playlist_from_yt`. Defaults to None.
 
     Returns:
         tuple[io.StringIO, str]: A StringIO object (TL;DR, a file-like thingy) containing the freshly dumped CSV archive, and a filename suggestion (str) like <playlist-title>-<date>.csv.
     """
-    playlist_dict = _get_playlist_from_yt(playlist_id, browser)
+    known = None
+    # Number of incremental refreshes in a row that led to `base`
+    refreshed = int(base.get("refreshed", 0)) if (base is not None) else 0
 
-    strio = io.StringIO()
+    if base is not None:
+        if refreshed >= verify_every:
+            print(txt.message_dump_refresh_verify.format(count=refreshed))
+        else:
+            known = base["data"]
+
+    playlist_dict = _get_playlist_from_yt(
+        playlist_id, browser, chunk_size=chunk_size, checkpoint=checkpoint, known=known, on_entry=on_entry
+    )
+
+    if playlist_dict["reused"] > 0:
+        playlist_dict["refreshed"] = refreshed + 1
+        print(
+            txt.message_dump_refreshed.format(
+                fetched=len(playlist_dict["entries"]) - playlist_dict["reused"],
+                reused=playlist_dict["reused"],
+            )
+        )
+
+    if enrich_cache is not None:
+        enrich_playlists(
+            [playlist_dict],
+            enrich_cache,
+            since={playlist_id: enrich_since or set()},
+            browser=browser,
+            jobs=enrich_jobs,
+            rate=enrich_rate,
+        )
 
-    _write_csv_header(playlist_dict, strio)
-    _write_csv_body(playlist_dict, strio)
+    return render(playlist_dict)
+
+
+def render(playlist_dict: dict) -> tuple[io.StringIO, str]:
+    """Write a fetched playlist as a CSV archive.
+
+    Args:
+        playlist_dict (dict): The playlist, as fetched by `_get_playlist_from_yt`.
+
+    Returns:
+        tuple[io.StringIO, str]: See `dump`.
+    """
+    # The body comes first, the header needs its checksum
+    body = io.StringIO()
+    _write_csv_body(playlist_dict, body)
+
+    strio = io.StringIO()
+    _write_csv_header(playlist_dict, strio, body.getvalue())
+    strio.write(body.getvalue())
 
     return (strio, f"""{playlist_dict["title"]} - {datetime.now().strftime("%Y-%m-%d")}.csv""")
+
+
+def enrich_playlists(
+    playlist_dicts: list[dict],
+    enrich_cache: str,
+    since: dict[str, set[str]] = None,
+    browser: str = None,
+    jobs: int = enrich.ENRICH_JOBS,
+    rate: float = enrich.ENRICH_RATE,
+):
+    """Enrich the new videos of several playlists in one go, so that videos they share are only fetched once.
+
+    Args:
+        playlist_dicts (list[dict]): The playlists, as fetched by `_get_playlist_from_yt`. They get an "enrichment" entry, used by `render`.
+        enrich_cache (str): Path to the enrichment cache.
+        since (dict[str, set[str]], optional): For each playlist ID, YouTube IDs found in its last snapshot (these aren't new). Defaults to None, i.e. every video is new.
+        browser (str, optional): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23. Defaults to None.
+        jobs (int, optional): Number of videos enriched concurrently. Defaults to `enrich.ENRICH_JOBS`.
+        rate (float, optional): Maximum number of videos enriched per second. Defaults to `enrich.ENRICH_RATE`.
+    """
+    since = since or {}
+    new_ids = []
+
+    for playlist_dict in playlist_dicts:
+        known = since.get(playlist_dict["id"], set())
+        new_ids.extend(
+            entry.id
+            for entry in playlist_dict["entries"]
+            if (not entry.unavailable) and (entry.id not in known)
+        )
+
+    # Same sessions as for playlists, so that `SOURCE` and `SCHEDULER` apply to enrichment too
+    enrichment = enrich.enrich(
+        new_ids,
+        enrich_cache,
+        session=functools.partial(_session, browser),
+        extract=_extract_video,
+        jobs=jobs,
+        rate=rate,
+    )
+
+    for playlist_dict in playlist_dicts:
+        playlist_dict["enrichment"] = enrichment
+
+
+def channel_playlists(channel: str, browser: str = None) -> list[tuple[str, str]]:
+    """List the playlists of a channel.
+
+    Args:
+        channel (str): Handle (e.g. `@RickAstleyYT`) or ID (e.g. `UCuAXFkgsw1L7xaCfnd5JJOw`) of the channel.
+        browser (str, optional): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23. Defaults to None.
+
+    Returns:
+        list[tuple[str, str]]: YouTube ID and title of every playlist of the channel.
+    """
+    path = channel if channel.startswith("@") else f"channel/{channel}"
+
+    with _session(browser) as ydl:
+        channel_dict = _extract(ydl, f"{SOURCE}/{path}/playlists")
+        return [
+            (entry["id"], entry.get("title"))
+            for entry in channel_dict.get("entries") or []
+            # Channel pages can also link to other channels
+            if entry.get("ie_key") == "YoutubeTab" and entry.get("id")
+        ]
+
+
+def dump_channel(
+    playlists: list[tuple[str, str]],
+    browser: str = None,
+    jobs: int = CHANNEL_JOBS,
+    chunk_size: int = CHUNK_SIZE,
+    checkpoint_dir: str = None,
+) -> list[dict]:
+    """Fetch several playlists concurrently, typically the ones found by `channel_playlists`.
+
+    Each worker thread keeps its own `yt_dlp` session for all the playlists it fetches. Videos found in more than one
+    playlist share the same `Entry` record. A playlist that can't be fetched (private, deleted, out of retries) doesn't
+    stop the others.
+
+    Args:
+        playlists (list[tuple[str, str]]): YouTube ID and title of the playlists.
+        browser (str, optional): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23. Defaults to None.
+        jobs (int, optional): Number of playlists fetched concurrently. Defaults to `CHANNEL_JOBS`.
+        chunk_size (int, optional): Number of entries fetched between two checkpoints. Defaults to `CHUNK_SIZE`.
+        checkpoint_dir (str, optional): Directory for the partial files, see `checkpoint_path`. Defaults to None, i.e. no checkpointing.
+
+    Returns:
+        list[dict]: The playlists as fetched by `_get_playlist_from_yt`, in the same order as `playlists`. Pass them to `render` once done. Playlists that couldn't be fetched only have an "id", a "title", no "entries", and the reason in "error".
+    """
+    titles = dict(playlists)
+    local = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+
+    def fetch(playlist_id: str) -> dict:
+        if not hasattr(local, "ydl"):
+            local.ydl = _session(browser)
+            with sessions_lock:
+                sessions.append(local.ydl)
+
+        try:
+            playlist_dict = _get_playlist_from_yt(
+                playlist_id,
+                browser,
+                chunk_size=chunk_size,
+                checkpoint=checkpoint_path(playlist_id, checkpoint_dir)
+                if (checkpoint_dir is not None)
+                else None,
+                ydl=local.ydl,
+                fatal=False,
+            )
+        except yt_dlp.utils.YoutubeDLError as e:
+            print(txt.warn_channel_playlist_failed.format(id=playlist_id, retries=CHUNK_RETRIES))
+            return {"id": playlist_id, "title": titles.get(playlist_id), "entries": [], "error": str(e)}
+        print(
+            txt.message_channel_playlist_fetched.format(id=playlist_id, count=len(playlist_dict["entries"]))
+        )
+
+        return playlist_dict
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            playlist_dicts = list(executor.map(fetch, [playlist_id for playlist_id, _ in playlists]))
+    finally:
+        for ydl in sessions:
+            ydl.close()
+
+    # One record per video, however many playlists it's in
+    shared = {}
+    for playlist_dict in playlist_dicts:
+        playlist_dict["entries"] = [shared.setdefault(entry.id, entry) for entry in playlist_dict["entries"]]
+
+    return playlist_dicts
+
+
+def write_channel_index(index_path: str, channel: str, playlist_dicts: list[dict], paths: list[str]):
+    """Write the index of a channel dump, listing every playlist and where its archive went.
+
+    Args:
+        index_path (str): Path to the index (JSON).
+        channel (str): Handle or ID of the channel.
+        playlist_dicts (list[dict]): The playlists, as returned by `dump_channel`.
+        paths (list[str]): Path of the archive of each playlist, in the same order. `None` for the ones that couldn't be fetched or written.
+    """
+    index = {
+        "channel": channel,
+        "archived_on": int(time.time() * 1000),
+        "playlists": [
+            {
+                "id": playlist_dict["id"],
+                "title": playlist_dict.get("title"),
+                "videos": len(playlist_dict["entries"]),
+                "unavailable": sum(entry.unavailable for entry in playlist_dict["entries"]),
+                "path": path,
+                # Only for playlists that couldn't be fetched
+                **({"error": playlist_dict["error"]} if ("error" in playlist_dict) else {}),
+            }
+            for playlist_dict, path in zip(playlist_dicts, paths)
+        ],
+    }
+
+    archive.write_atomic(index_path, json.dumps(index, ensure_ascii=False, indent=1))
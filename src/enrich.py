@@ -0,0 +1,211 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Enrichment service for the script. Fetches the full metadata of videos that flat playlist extraction doesn't provide.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import archive
+
+try:
+    import yt_dlp
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`yt-dlp`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Bump this whenever the layout of the cache file changes
+CACHE_VERSION = 1
+# Number of videos fetched concurrently
+ENRICH_JOBS = 4
+# Maximum number of videos fetched per second
+ENRICH_RATE = 2.0
+# Descriptions are cut down to that many characters, the beginning is enough to identify reuploads
+DESCRIPTION_LENGTH = 500
+# Columns added to the CSV header of enriched archives
+CSV_HEADER_EXTENSION = ", duration, uploadDate, description"
+
+
+class RateLimiter:
+    """Spaces out calls to `wait` so that no more than `rate` of them return per second, across all threads.
+
+    A `rate` of 0 (or less) means unlimited.
+    """
+
+    def __init__(self, rate: float):
+        self._interval = (1 / rate) if (rate > 0) else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Block until the caller is allowed to go."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+
+        time.sleep(max(0.0, start - now))
+
+
+def load_cache(cache_path: str) -> dict:
+    """Load the enrichment cache from the disk.
+
+    Args:
+        cache_path (str): Path to the cache (JSON).
+
+    Returns:
+        dict: The cache, or an empty one if `cache_path` doesn't exist yet or is from an older version.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {"version": CACHE_VERSION, "videos": {}}
+
+    return cache if (cache.get("version") == CACHE_VERSION) else {"version": CACHE_VERSION, "videos": {}}
+
+
+def save_cache(cache: dict, cache_path: str):
+    """Write the enrichment cache to the disk.
+
+    Args:
+        cache (dict): The cache.
+        cache_path (str): Path to the cache (JSON).
+    """
+    archive.write_atomic(cache_path, json.dumps(cache, ensure_ascii=False))
+
+
+def _fetch(
+    video_id: str,
+    session,
+    extract,
+    local: threading.local,
+    instances: list,
+    limiter: RateLimiter,
+):
+    """Fetch the full metadata of one video. Runs in a worker thread.
+
+    Args:
+        video_id (str): YouTube ID of the video.
+        session (callable): Opens a `yt_dlp` instance, see `enrich`.
+        extract (callable): Extracts a video with a `yt_dlp` instance, see `enrich`.
+        local (threading.local): Per-thread storage, so that each thread reuses its own `yt_dlp` instance.
+        instances (list): Every `yt_dlp` instance created so far, to be closed by the caller.
+        limiter (RateLimiter): Shared rate limiter.
+
+    Returns:
+        tuple[str, dict | None]: The video ID, and its metadata (`None` if it couldn't be fetched).
+    """
+    if not hasattr(local, "ydl"):
+        local.ydl = session()
+        instances.append(local.ydl)
+
+    limiter.wait()
+    try:
+        info = extract(local.ydl, video_id)
+    except yt_dlp.utils.YoutubeDLError:
+        return (video_id, None)
+
+    return (
+        video_id,
+        {
+            "duration": info.get("duration"),
+            "upload_date": info.get("upload_date"),
+            "description": (info.get("description") or "")[:DESCRIPTION_LENGTH],
+        },
+    )
+
+
+def enrich(
+    video_ids: list[str],
+    cache_path: str,
+    session,
+    extract,
+    jobs: int = ENRICH_JOBS,
+    rate: float = ENRICH_RATE,
+) -> dict:
+    """Fetch the full metadata of `video_ids`, skipping the ones already in the cache.
+
+    Args:
+        video_ids (list[str]): YouTube IDs of the videos to enrich, typically the ones added since the last snapshot.
+        cache_path (str): Path to the cache (JSON), created if needed. Every video is only ever fetched once.
+        session (callable): Opens a `yt_dlp` instance, called once per worker thread, e.g. `dump._session`.
+        extract (callable): Extracts the information dictionary of a video, given a `yt_dlp` instance and the YouTube ID, e.g. `dump._extract_video`.
+        jobs (int, optional): Number of videos fetched concurrently. Defaults to `ENRICH_JOBS`.
+        rate (float, optional): Maximum number of videos fetched per second, 0 for unlimited. Defaults to `ENRICH_RATE`.
+
+    Returns:
+        dict: The whole cache, i.e. YouTube IDs as keys and metadata ("duration", "upload_date", "description") as values.
+    """
+    cache = load_cache(cache_path)
+    videos = cache["videos"]
+    # The same video can be found several times, e.g. in different playlists
+    video_ids = list(dict.fromkeys(video_ids))
+    todo = [video_id for video_id in video_ids if video_id not in videos]
+
+    print(txt.message_enrich_fetching.format(count=len(todo), cached=len(video_ids) - len(todo)))
+
+    if len(todo) > 0:
+        local = threading.local()
+        instances = []
+        limiter = RateLimiter(rate)
+
+        try:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(_fetch, video_id, session, extract, local, instances, limiter)
+                    for video_id in todo
+                ]
+                try:
+                    for future in futures:
+                        video_id, info = future.result()
+                        # Failures aren't cached, they'll be retried next time
+                        if info is not None:
+                            videos[video_id] = info
+                except KeyboardInterrupt:
+                    # Only wait for the lookups in flight, not for every one queued
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            for ydl in instances:
+                ydl.close()
+            # Whatever was fetched is worth keeping, even if something went wrong
+            save_cache(cache, cache_path)
+
+    return videos
+
+
+def format_extension(info: dict | None) -> str:
+    """Format the additional columns of an enriched archive for one video.
+
+    Args:
+        info (dict | None): Metadata of the video as returned by `enrich`, `None` if unknown.
+
+    Returns:
+        str: The additional columns, starting with a separator (to be inserted before the trailing newline).
+    """
+    if info is None:
+        return """, , , \"\""""
+
+    # One video per line, and quotes are escaped the CSV way
+    description = " ".join(info["description"].split()).replace('"', '""')
+
+    return (
+        f""", {info["duration"] if info["duration"] is not None else ""}"""
+        + f""", {info["upload_date"] or ""}"""
+        + f""", \"{description}\""""
+    )
+
+
+# ------------------------------------- . ------------------------------------ #
@@ -0,0 +1,258 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Knowledge base service for the script. Every CSV archive in a directory tree --> one metadata store indexed by video ID.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import json
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+import archive
+import loader
+import watch
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Bump this whenever the layout of the knowledge base file changes
+KB_VERSION = 1
+
+
+def _empty() -> dict:
+    """Creates a knowledge base that hasn't ingested anything yet.
+
+    Returns:
+        dict: The empty knowledge base.
+    """
+    return {"version": KB_VERSION, "files": {}, "videos": {}}
+
+
+def _archive_paths(root: str) -> list[str]:
+    """Walk `root` looking for CSV archives.
+
+    Args:
+        root (str): Directory to walk.
+
+    Returns:
+        list[str]: Absolute paths of every `.csv` file found in the tree.
+    """
+    paths = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if file_name.endswith(".csv"):
+                paths.append(os.path.abspath(os.path.join(dir_path, file_name)))
+
+    return sorted(paths)
+
+
+def _stamp(path: str) -> list[int]:
+    """Cheap fingerprint used to tell whether a file changed since it was last ingested.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        list[int]: Modification time (ns) and size of the file.
+    """
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load(kb_path: str) -> dict:
+    """Load the knowledge base from the disk.
+
+    Args:
+        kb_path (str): Path to the knowledge base (JSON).
+
+    Returns:
+        dict: The knowledge base, or an empty one if `kb_path` doesn't exist yet or is from an older version.
+    """
+    try:
+        with open(kb_path, "r", encoding="utf-8") as f:
+            kb = json.load(f)
+    except FileNotFoundError:
+        return _empty()
+
+    return kb if (kb.get("version") == KB_VERSION) else _empty()
+
+
+def save(kb: dict, kb_path: str):
+    """Write the knowledge base to the disk.
+
+    Args:
+        kb (dict): The knowledge base.
+        kb_path (str): Path to the knowledge base (JSON).
+    """
+    archive.write_atomic(kb_path, json.dumps(kb, ensure_ascii=False))
+
+
+def _merge(kb: dict, columns: "loader.Columns") -> bool:
+    """Merge the rows of one archive into `kb`, keeping the most recent metadata for each video.
+
+    Args:
+        kb (dict): The knowledge base.
+        columns (loader.Columns): The archive, as loaded by `loader.load`.
+
+    Returns:
+        bool: `False` if the file isn't a readable archive, `True` otherwise.
+    """
+    try:
+        playlist_id = columns.header["playlist_id"]
+        date = diff.unix_time(columns.header["save_date"])
+    except (KeyError, ValueError):
+        return False
+
+    videos = kb["videos"]
+
+    for i in range(len(columns)):
+        # Unavailable rows carry no metadata worth keeping
+        if columns.unavailable[i]:
+            continue
+        video_id = columns.id(i)
+        known = videos.get(video_id)
+        # `known` is `[date, playlist_id, row]`
+        if (known is None) or (known[0] < date):
+            videos[video_id] = [date, playlist_id, columns.row(i)]
+
+    return True
+
+
+def build(root: str, kb_path: str, jobs: int = None) -> tuple[int, int]:
+    """(Re)build the knowledge base from every archive found under `root`. Only new or modified files are parsed.
+
+    Args:
+        root (str): Directory containing the archives, walked recursively.
+        kb_path (str): Path to the knowledge base (JSON), created if needed.
+        jobs (int, optional): Number of worker processes. Defaults to None, i.e. one per CPU.
+
+    Returns:
+        tuple[int, int]: Number of archives ingested during this run, and number of videos known in total.
+    """
+    kb = load(kb_path)
+    known_files = kb["files"]
+
+    # Skip whatever was already ingested and hasn't been touched since
+    todo = {}
+    found = set()
+    for path in _archive_paths(root):
+        stamp = _stamp(path)
+        found.add(path)
+        if known_files.get(path) != stamp:
+            todo[path] = stamp
+    _forget(kb, [path for path in known_files if path not in found])
+
+    ingested = _ingest(kb, todo, jobs)
+    save(kb, kb_path)
+
+    return (ingested, len(kb["videos"]))
+
+
+def _ingest(kb: dict, todo: dict, jobs: int = None) -> int:
+    """Parse archives and merge them into `kb`.
+
+    Args:
+        kb (dict): The knowledge base.
+        todo (dict): Paths of the archives as keys, and their stamp (see `_stamp`) as values.
+        jobs (int, optional): Number of worker processes. Defaults to None, i.e. one per CPU.
+
+    Returns:
+        int: Number of archives ingested.
+    """
+    ingested = 0
+    # Files are parsed in worker processes, and merged here as they come
+    for columns in loader.load(list(todo.keys()), jobs=jobs):
+        if (columns is None) or (not _merge(kb, columns)):
+            continue
+        kb["files"][columns.path] = todo[columns.path]
+        ingested += 1
+
+    return ingested
+
+
+def _forget(kb: dict, paths: list[str]) -> int:
+    """Forget archives removed from the disk, so that they get ingested again if they ever come back.
+
+    The metadata they brought is kept : the knowledge base remembers every video seen, not only the ones still archived.
+
+    Args:
+        kb (dict): The knowledge base.
+        paths (list[str]): Paths of the removed archives, or of removed directories.
+
+    Returns:
+        int: Number of archives forgotten.
+    """
+    known_files = kb["files"]
+    removed = set(paths)
+    directories = tuple(path + os.sep for path in removed)
+    gone = [path for path in known_files if (path in removed) or path.startswith(directories)]
+    for path in gone:
+        del known_files[path]
+
+    return len(gone)
+
+
+def follow(root: str, kb_path: str, jobs: int = None, poll: bool = False):
+    """Keep the knowledge base up to date as archives land under `root`, until interrupted. Only new or modified archives are parsed.
+
+    Args:
+        root (str): Directory containing the archives, watched recursively.
+        kb_path (str): Path to the knowledge base (JSON), built first if needed.
+        jobs (int, optional): Number of worker processes. Defaults to None, i.e. one per CPU.
+        poll (bool, optional): Whether to poll the directory even if inotify is available. Defaults to False.
+    """
+    # Start watching first, so that nothing landing during the initial build is missed
+    watcher = watch.Watcher(root, poll=poll)
+    ingested, count = build(root, kb_path, jobs=jobs)
+    print(txt.message_kb_built.format(ingested=ingested, count=count, path=kb_path))
+    print(txt.message_kb_watching.format(path=root, backend=watcher.backend))
+
+    # Kept in memory from now on, and saved after each batch
+    kb = load(kb_path)
+    try:
+        for paths in watcher.batches():
+            todo = {}
+            gone = []
+            for path in map(os.path.abspath, paths):
+                try:
+                    stamp = _stamp(path)
+                except OSError:
+                    gone.append(path)
+                    continue
+                # Touched, but not actually changed
+                if kb["files"].get(path) != stamp:
+                    todo[path] = stamp
+            forgotten = _forget(kb, gone)
+            if (len(todo) == 0) and (forgotten == 0):
+                continue
+            ingested = _ingest(kb, todo, jobs)
+            save(kb, kb_path)
+            print(txt.message_kb_updated.format(ingested=ingested, count=len(kb["videos"])))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+
+def fallback(kb_path: str) -> dict:
+    """Load the knowledge base as a fallback metadata source for `diff.diff`.
+
+    Args:
+        kb_path (str): Path to the knowledge base (JSON).
+
+    Returns:
+        dict: Dictionary with YouTube IDs as keys and their most recent available archive row as values.
+    """
+    kb = load(kb_path)
+    print(txt.kb_section)
+    print(txt.message_kb_loaded.format(path=kb_path, count=len(kb["videos"])))
+
+    return {video_id: known[2] for (video_id, known) in kb["videos"].items()}
+
+
+# ------------------------------------- . ------------------------------------ #
@@ -0,0 +1,166 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Lazy archive reader for the script. A drop-in replacement for `diff.read` on large archives.
+
+The archive is memory-mapped, and a single scan records where each row starts along with its ID and availability.
+Nothing else is decoded until a row is actually accessed : diffing only looks at the IDs and availability of every
+video, and at the titles and channels of the handful of videos that were lost.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import re
+import csv
+import mmap
+from array import array
+
+# Should be safe as long as the script is distributed as a zipapp
+import diff
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Start of a row : index, ID and availability. YouTube IDs never contain commas, quotes or spaces.
+ROW_START = re.compile(rb"^(\d+), ([^,\s]*), (True|False),", re.MULTILINE)
+
+
+class LazyRow:
+    """One video of a `LazyRows`. Reads like the rows of `diff.read`, but only decodes its line when a field other than
+    the ID (1) or availability (2) is requested."""
+
+    __slots__ = ("_rows", "_i", "_decoded")
+
+    def __init__(self, rows: "LazyRows", i: int):
+        self._rows = rows
+        self._i = i
+        self._decoded = None
+
+    def decode(self) -> list[str]:
+        """Every field of the row, as `diff.read` would return them."""
+        if self._decoded is None:
+            # Archives written on Windows end their lines with CRLF
+            line = self._rows.line(self._i).rstrip(b"\r\n").decode("utf-8")
+            self._decoded = next(csv.reader([line], delimiter=",", skipinitialspace=True))
+
+        return self._decoded
+
+    def __getitem__(self, key: int) -> str:
+        if key == 1:
+            return self._rows.ids[self._i]
+        if key == 2:
+            return "True" if self._rows.unavailable[self._i] else "False"
+
+        return self.decode()[key]
+
+    def __len__(self) -> int:
+        return len(self.decode())
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __repr__(self) -> str:
+        return repr(self.decode())
+
+
+class LazyRows:
+    """The videos of an archive, as a sequence of `LazyRow`. Holds the memory map until `close` is called, rows can't be
+    decoded past that."""
+
+    def __init__(self, buffer: mmap.mmap | bytes, offsets: array, ids: list[str], unavailable: bytearray):
+        """
+        Args:
+            buffer (mmap.mmap | bytes): The whole archive.
+            offsets (array): Start of each row in `buffer`, plus the end of the last one.
+            ids (list[str]): YouTube ID of each row.
+            unavailable (bytearray): Availability of each row, non-zero if unavailable.
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+        self.ids = ids
+        self.unavailable = unavailable
+
+    def line(self, i: int) -> bytes:
+        """Raw bytes of row `i`."""
+        return self.buffer[self.offsets[i] : self.offsets[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> LazyRow:
+        if i < 0:
+            i += len(self)
+        if not (0 <= i < len(self)):
+            raise IndexError("row index out of range")
+
+        return LazyRow(self, i)
+
+    def __iter__(self):
+        return (LazyRow(self, i) for i in range(len(self)))
+
+    def close(self):
+        """Release the memory map."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self) -> "LazyRows":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read(path: str) -> dict:
+    """Reads CSV archives in the `yt-playlist-diff` format, lazily. See `diff.read`.
+
+    Args:
+        path (str): Path to the archive.
+
+    Returns:
+        dict: Dictionary representing the archive, in the same format as `diff.read`. "data" is a `LazyRows`, see `close`.
+    """
+    with open(path, "rb") as f:
+        # Empty files can't be mapped
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if (f.seek(0, 2) > 0) else b""
+
+    position = 0
+
+    def _lines():
+        nonlocal position
+        while position < len(buffer):
+            end = buffer.find(b"\n", position)
+            end = len(buffer) if (end < 0) else end + 1
+            line = buffer[position:end].rstrip(b"\r\n").decode("utf-8")
+            position = end
+            yield line
+
+    # Metadata, `position` ends up right where the CSV data begins
+    out = diff.read_header(_lines())
+
+    # Data, in a single scan
+    offsets = array("Q")
+    ids = []
+    unavailable = bytearray()
+    for match in ROW_START.finditer(buffer, position):
+        offsets.append(match.start())
+        ids.append(match.group(2).decode("utf-8"))
+        unavailable.append(match.group(3) == b"True")
+    offsets.append(len(buffer))
+
+    out["data"] = LazyRows(buffer, offsets, ids, unavailable)
+
+    return out
+
+
+def close(archive: dict):
+    """Release the memory map behind an archive returned by `read`, once it's no longer needed.
+
+    Args:
+        archive (dict): The archive. Anything else (e.g. an archive returned by `diff.read`) is left alone.
+    """
+    if isinstance(archive.get("data"), LazyRows):
+        archive["data"].close()
+
+
+# ------------------------------------- . ------------------------------------ #
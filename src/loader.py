@@ -0,0 +1,208 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Parallel archive loader for the script. Archives are parsed in worker processes, which send back compact columns.
+
+Sending parsed rows (lists of lists of str) back to the parent would pickle one object per field, and most of the time
+gained by parsing in parallel would be lost to inter-process communication. Instead, each worker packs the text fields
+of an archive into a single string blob, with their boundaries in an array of offsets, and availability in a bytearray.
+Those pickle as a handful of large buffers.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import csv
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+
+try:
+    import prettytable as pt
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`prettytable`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Text fields kept per row, in the order they are packed : index, id, channel, channelUrl, title
+FIELDS = 5
+# Archives parsed ahead of the one being consumed, per worker. Bounds memory when streaming long series.
+WINDOW = 4
+
+
+class Columns:
+    """One archive, as packed by a worker. Rows read back the same as the ones from `diff.read` (core columns only)."""
+
+    __slots__ = ("path", "header", "blob", "offsets", "unavailable")
+
+    def __init__(self, path: str, header: dict, blob: str, offsets: array, unavailable: bytearray):
+        self.path = path
+        self.header = header
+        self.blob = blob
+        self.offsets = offsets
+        self.unavailable = unavailable
+
+    def __len__(self) -> int:
+        return len(self.unavailable)
+
+    def _field(self, i: int, field: int) -> str:
+        start = i * FIELDS + field
+        return self.blob[self.offsets[start] : self.offsets[start + 1]]
+
+    def id(self, i: int) -> str:
+        """YouTube ID of the video in row `i`."""
+        return self._field(i, 1)
+
+    def ids(self) -> list[str]:
+        """YouTube IDs of every video, in order."""
+        return [self._field(i, 1) for i in range(len(self))]
+
+    def row(self, i: int) -> list[str]:
+        """Row `i`, i.e. `[index, id, isUnavailable, channel, channelUrl, title]`."""
+        index, video_id, channel, channel_url, title = (self._field(i, field) for field in range(FIELDS))
+        return [index, video_id, "True" if self.unavailable[i] else "False", channel, channel_url, title]
+
+    def rows(self) -> "Rows":
+        """Every row, unpacked only when accessed. Stands in for the `data` of `diff.read`."""
+        return Rows(self)
+
+    def read(self) -> dict:
+        """Unpack the whole archive.
+
+        Returns:
+            dict: The archive, in the same format as `diff.read`.
+        """
+        return {**self.header, "data": [self.row(i) for i in range(len(self))]}
+
+
+class Rows:
+    """Read-only view over the rows of a `Columns`, indexed like a list of `Columns.row`."""
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Columns):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getitem__(self, i: int) -> list[str]:
+        return self.columns.row(i)
+
+
+def parse(path: str) -> Columns:
+    """Parse one archive into columns. Runs in a worker process.
+
+    Args:
+        path (str): Path to the archive.
+
+    Returns:
+        Columns: The archive. Malformed rows are skipped, and so are any columns past the core ones (e.g. enrichment).
+    """
+    parts = []
+    offsets = array("L", [0])
+    unavailable = bytearray()
+    position = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        header = diff.read_header(f)
+        for row in csv.reader(f, delimiter=",", skipinitialspace=True):
+            if len(row) < 6:
+                continue
+            for field in (row[0], row[1], row[3], row[4], row[5]):
+                parts.append(field)
+                position += len(field)
+                offsets.append(position)
+            unavailable.append(row[2] == "True")
+
+    return Columns(path, header, "".join(parts), offsets, unavailable)
+
+
+def _parse_safe(path: str) -> Columns | None:
+    """Same as `parse`, but unreadable files yield `None` instead of raising. Runs in a worker process."""
+    try:
+        return parse(path)
+    except (OSError, UnicodeDecodeError, ValueError, csv.Error):
+        return None
+
+
+def load(paths: list[str], jobs: int = None, strict: bool = False):
+    """Parse archives in parallel, and yield them in order as they become available.
+
+    Only a bounded number of archives are parsed ahead of the consumer, so arbitrarily long series can be streamed.
+
+    Args:
+        paths (list[str]): Paths to the archives.
+        jobs (int, optional): Number of worker processes. Defaults to None, i.e. one per CPU.
+        strict (bool, optional): Whether unreadable files should raise, rather than be yielded as `None`. Defaults to False.
+
+    Yields:
+        Columns | None: Each archive, in the order of `paths`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    worker = parse if strict else _parse_safe
+
+    # Not worth spawning processes for
+    if (jobs == 1) or (len(paths) <= 1):
+        for path in paths:
+            yield worker(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        todo = iter(paths)
+        for path in todo:
+            pending.append(executor.submit(worker, path))
+            if len(pending) >= jobs * WINDOW:
+                break
+        while len(pending) > 0:
+            columns = pending.popleft().result()
+            # Keep the window full
+            for path in todo:
+                pending.append(executor.submit(worker, path))
+                break
+            yield columns
+
+
+def benchmark(paths: list[str], max_jobs: int = None) -> list[tuple[int, float, int]]:
+    """Time `load` over the same archives with 1 to `max_jobs` worker processes.
+
+    Args:
+        paths (list[str]): Paths to the archives.
+        max_jobs (int, optional): Highest number of worker processes to try. Defaults to None, i.e. one per CPU.
+
+    Returns:
+        list[tuple[int, float, int]]: For each number of workers, the wall time (s) and the number of rows loaded.
+    """
+    out = []
+    for jobs in range(1, (max_jobs or os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        rows = sum(len(columns) for columns in load(paths, jobs=jobs) if (columns is not None))
+        out.append((jobs, time.perf_counter() - start, rows))
+
+    return out
+
+
+def summary(results: list[tuple[int, float, int]]):
+    """Print the output of `benchmark`.
+
+    Args:
+        results (list[tuple[int, float, int]]): Output of `benchmark`.
+    """
+    table = pt.PrettyTable(padding_width=3)
+    table.set_style(pt.SINGLE_BORDER)
+    table.field_names = [txt.header_jobs, txt.header_seconds, txt.header_rows_per_second, txt.header_speedup]
+    for jobs, seconds, rows in results:
+        table.add_row([jobs, f"{seconds:.2f}", f"{rows / seconds:,.0f}", f"x{results[0][1] / seconds:.2f}"])
+    print(table)
+
+
+# ------------------------------------- . ------------------------------------ #
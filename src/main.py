@@ -11,6 +11,9 @@
 #                                 IMPORT LOGIC                                 #
 # ---------------------------------------------------------------------------- #
 
+import os
+import time
+import atexit
 import argparse
 
 # Should be safe as long as the script is distributed as a zipapp
@@ -18,6 +21,20 @@ import misc_text as txt
 from misc_text import Operation, SubArgs
 import dump
 import diff
+import kb
+import archive
+import enrich
+import standin
+import stats
+import verify
+import compact
+import loader
+import server
+import lazy
+import pipeline
+import scheduler
+import metrics
+import batch
 
 try:
     from rich_argparse import RawTextRichHelpFormatter
@@ -53,18 +70,127 @@ def parser_setup():
     dump_parser = subparsers.add_parser(Operation.DUMP.value, help=txt.arg_operation_dump, formatter_class=parser.formatter_class)
     dump_parser.add_argument(SubArgs.ID.value, required=True, metavar="PLAYLIST_ID", help=txt.arg_id)
     dump_parser.add_argument(SubArgs.BROWSER.value, metavar="BROWSER", help=txt.arg_browser)
-    dump_parser.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_path)
+    dump_output = dump_parser.add_mutually_exclusive_group()
+    dump_output.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_path)
+    dump_output.add_argument(SubArgs.ARCHIVE_ROOT.value, metavar="PATH", help=txt.arg_archive_root)
+    dump_parser.add_argument(SubArgs.CHUNK_SIZE.value, type=int, default=dump.CHUNK_SIZE, metavar="N", help=txt.arg_chunk_size)
+    dump_parser.add_argument(SubArgs.REFRESH_BASE.value, metavar="PATH", help=txt.arg_refresh_base)
+    dump_parser.add_argument(SubArgs.VERIFY_EVERY.value, type=int, default=dump.REFRESH_VERIFY_EVERY, metavar="N", help=txt.arg_verify_every)
+    dump_parser.add_argument(SubArgs.SOURCE.value, metavar="URL", help=txt.arg_source)
+    dump_parser.add_argument(SubArgs.FETCH_STATE.value, metavar="PATH", help=txt.arg_fetch_state)
+    dump_parser.add_argument(SubArgs.BUDGET.value, type=scheduler.budget, action="append", metavar="HOST=RATE", help=txt.arg_budget)
+    dump_parser.add_argument(SubArgs.ENRICH.value, metavar="PATH", help=txt.arg_enrich)
+    dump_parser.add_argument(SubArgs.ENRICH_JOBS.value, type=int, default=enrich.ENRICH_JOBS, metavar="N", help=txt.arg_enrich_jobs)
+    dump_parser.add_argument(SubArgs.ENRICH_RATE.value, type=float, default=enrich.ENRICH_RATE, metavar="N", help=txt.arg_enrich_rate)
+    dump_parser.add_argument(SubArgs.METRICS.value, metavar="PATH", help=txt.arg_metrics)
+    dump_parser.add_argument(SubArgs.STATSD.value, metavar="HOST:PORT", help=txt.arg_statsd)
+
+    # Arguments related to Operation.CHANNEL
+    channel_parser = subparsers.add_parser(Operation.CHANNEL.value, help=txt.arg_operation_channel, formatter_class=parser.formatter_class)
+    channel_parser.add_argument(SubArgs.ID.value, required=True, metavar="CHANNEL", help=txt.arg_channel_id)
+    channel_parser.add_argument(SubArgs.BROWSER.value, metavar="BROWSER", help=txt.arg_browser)
+    channel_output = channel_parser.add_mutually_exclusive_group(required=True)
+    channel_output.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_channel_output)
+    channel_output.add_argument(SubArgs.ARCHIVE_ROOT.value, metavar="PATH", help=txt.arg_archive_root)
+    channel_parser.add_argument(SubArgs.JOBS.value, type=int, default=dump.CHANNEL_JOBS, metavar="N", help=txt.arg_channel_jobs)
+    channel_parser.add_argument(SubArgs.CHUNK_SIZE.value, type=int, default=dump.CHUNK_SIZE, metavar="N", help=txt.arg_chunk_size)
+    channel_parser.add_argument(SubArgs.FETCH_STATE.value, metavar="PATH", help=txt.arg_fetch_state)
+    channel_parser.add_argument(SubArgs.BUDGET.value, type=scheduler.budget, action="append", metavar="HOST=RATE", help=txt.arg_budget)
+    channel_parser.add_argument(SubArgs.ENRICH.value, metavar="PATH", help=txt.arg_enrich)
+    channel_parser.add_argument(SubArgs.ENRICH_JOBS.value, type=int, default=enrich.ENRICH_JOBS, metavar="N", help=txt.arg_enrich_jobs)
+    channel_parser.add_argument(SubArgs.ENRICH_RATE.value, type=float, default=enrich.ENRICH_RATE, metavar="N", help=txt.arg_enrich_rate)
+    channel_parser.add_argument(SubArgs.METRICS.value, metavar="PATH", help=txt.arg_metrics)
+    channel_parser.add_argument(SubArgs.STATSD.value, metavar="HOST:PORT", help=txt.arg_statsd)
 
     # Arguments related to Operation.UPSTREAM
     upstream_diff_parser = subparsers.add_parser(Operation.UPSTREAM.value, help=txt.arg_operation_upstream, formatter_class=parser.formatter_class)
     upstream_diff_parser.add_argument(SubArgs.DIFF_BASE.value, required=True, metavar="PATH", help=txt.arg_diff_base)
     upstream_diff_parser.add_argument(SubArgs.ID_OVERRIDE.value, metavar="PLAYLIST_ID", help=txt.arg_id_override)
     upstream_diff_parser.add_argument(SubArgs.BROWSER.value, metavar="BROWSER", help=txt.arg_browser)
+    upstream_diff_parser.add_argument(SubArgs.KB.value, metavar="PATH", help=txt.arg_kb_fallback)
+    upstream_diff_parser.add_argument(SubArgs.SOURCE.value, metavar="URL", help=txt.arg_source)
+    upstream_diff_parser.add_argument(SubArgs.FETCH_STATE.value, metavar="PATH", help=txt.arg_fetch_state)
+    upstream_diff_parser.add_argument(SubArgs.BUDGET.value, type=scheduler.budget, action="append", metavar="HOST=RATE", help=txt.arg_budget)
+    upstream_diff_parser.add_argument(SubArgs.METRICS.value, metavar="PATH", help=txt.arg_metrics)
+    upstream_diff_parser.add_argument(SubArgs.STATSD.value, metavar="HOST:PORT", help=txt.arg_statsd)
 
     # Arguments related to Operation.LOCAL
     local_diff_parser = subparsers.add_parser(Operation.LOCAL.value, help=txt.arg_operation_local, formatter_class=parser.formatter_class)
     local_diff_parser.add_argument(SubArgs.DIFF_BASE.value, required=True, metavar="PATH", help=txt.arg_diff_base)
     local_diff_parser.add_argument(SubArgs.DIFF_WITH.value, required=True, metavar="PATH", help=txt.arg_diff_with)
+    local_diff_parser.add_argument(SubArgs.KB.value, metavar="PATH", help=txt.arg_kb_fallback)
+    local_diff_parser.add_argument(SubArgs.METRICS.value, metavar="PATH", help=txt.arg_metrics)
+    local_diff_parser.add_argument(SubArgs.STATSD.value, metavar="HOST:PORT", help=txt.arg_statsd)
+
+    # Arguments related to Operation.LATEST
+    latest_diff_parser = subparsers.add_parser(Operation.LATEST.value, help=txt.arg_operation_latest, formatter_class=parser.formatter_class)
+    latest_diff_parser.add_argument(SubArgs.ID.value, required=True, metavar="PLAYLIST_ID", help=txt.arg_id_latest)
+    latest_diff_parser.add_argument(SubArgs.ARCHIVE_ROOT.value, required=True, metavar="PATH", help=txt.arg_archive_root)
+    latest_diff_parser.add_argument(SubArgs.KB.value, metavar="PATH", help=txt.arg_kb_fallback)
+    latest_diff_parser.add_argument(SubArgs.METRICS.value, metavar="PATH", help=txt.arg_metrics)
+    latest_diff_parser.add_argument(SubArgs.STATSD.value, metavar="HOST:PORT", help=txt.arg_statsd)
+
+    # Arguments related to Operation.KB
+    kb_parser = subparsers.add_parser(Operation.KB.value, help=txt.arg_operation_kb, formatter_class=parser.formatter_class)
+    kb_parser.add_argument(SubArgs.ARCHIVES.value, required=True, metavar="PATH", help=txt.arg_archives)
+    kb_parser.add_argument(SubArgs.KB.value, required=True, metavar="PATH", help=txt.arg_kb)
+    kb_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs)
+    kb_parser.add_argument(SubArgs.WATCH.value, action="store_true", help=txt.arg_watch)
+    kb_parser.add_argument(SubArgs.POLL.value, action="store_true", help=txt.arg_poll)
+
+    # Arguments related to Operation.STATS
+    stats_parser = subparsers.add_parser(Operation.STATS.value, help=txt.arg_operation_stats, formatter_class=parser.formatter_class)
+    stats_parser.add_argument(SubArgs.ID.value, required=True, metavar="PLAYLIST_ID", help=txt.arg_id_stats)
+    stats_source = stats_parser.add_mutually_exclusive_group(required=True)
+    stats_source.add_argument(SubArgs.ARCHIVE_ROOT.value, metavar="PATH", help=txt.arg_archive_root_stats)
+    stats_source.add_argument(SubArgs.ARCHIVES.value, metavar="PATH", help=txt.arg_archives_stats)
+    stats_parser.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_stats_output)
+    stats_parser.add_argument(SubArgs.TOP.value, type=int, default=stats.TOP_CHANNELS, metavar="N", help=txt.arg_top)
+    stats_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs)
+
+    # Arguments related to Operation.BATCH
+    batch_parser = subparsers.add_parser(Operation.BATCH.value, help=txt.arg_operation_batch, formatter_class=parser.formatter_class)
+    batch_source = batch_parser.add_mutually_exclusive_group(required=True)
+    batch_source.add_argument(SubArgs.ARCHIVE_ROOT.value, metavar="PATH", help=txt.arg_archive_root_batch)
+    batch_source.add_argument(SubArgs.ARCHIVES.value, metavar="PATH", help=txt.arg_archives_batch)
+    batch_parser.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_batch_output)
+    batch_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs)
+
+    # Arguments related to Operation.VERIFY
+    verify_parser = subparsers.add_parser(Operation.VERIFY.value, help=txt.arg_operation_verify, formatter_class=parser.formatter_class)
+    verify_parser.add_argument(SubArgs.ARCHIVES.value, required=True, nargs="+", metavar="PATH", help=txt.arg_archives_verify)
+    verify_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs)
+
+    # Arguments related to Operation.COMPACT
+    compact_parser = subparsers.add_parser(Operation.COMPACT.value, help=txt.arg_operation_compact, formatter_class=parser.formatter_class)
+    compact_parser.add_argument(SubArgs.ID.value, required=True, metavar="PLAYLIST_ID", help=txt.arg_id_compact)
+    compact_source = compact_parser.add_mutually_exclusive_group(required=True)
+    compact_source.add_argument(SubArgs.ARCHIVE_ROOT.value, metavar="PATH", help=txt.arg_archive_root_stats)
+    compact_source.add_argument(SubArgs.ARCHIVES.value, metavar="PATH", help=txt.arg_archives_stats)
+    compact_parser.add_argument(SubArgs.OUTPUT.value, metavar="PATH", help=txt.arg_compact_output)
+
+    # Arguments related to Operation.BENCH_LOAD
+    bench_parser = subparsers.add_parser(Operation.BENCH_LOAD.value, help=txt.arg_operation_bench_load, formatter_class=parser.formatter_class)
+    bench_parser.add_argument(SubArgs.ARCHIVES.value, required=True, metavar="PATH", help=txt.arg_archives_bench)
+    bench_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs_bench)
+
+    # Arguments related to Operation.SERVE
+    serve_parser = subparsers.add_parser(Operation.SERVE.value, help=txt.arg_operation_serve, formatter_class=parser.formatter_class)
+    serve_parser.add_argument(SubArgs.ARCHIVES.value, required=True, metavar="PATH", help=txt.arg_archives_serve)
+    serve_parser.add_argument(SubArgs.PORT.value, type=int, default=8000, metavar="N", help=txt.arg_port_serve)
+    serve_parser.add_argument(SubArgs.REFRESH.value, type=float, default=server.REFRESH_INTERVAL, metavar="SECONDS", help=txt.arg_refresh)
+    serve_parser.add_argument(SubArgs.JOBS.value, type=int, metavar="N", help=txt.arg_jobs)
+
+    # Arguments related to Operation.STANDIN
+    standin_parser = subparsers.add_parser(Operation.STANDIN.value, help=txt.arg_operation_standin, formatter_class=parser.formatter_class)
+    standin_parser.add_argument(SubArgs.RECORDING.value, required=True, metavar="PATH", help=txt.arg_recording)
+    standin_parser.add_argument(SubArgs.PORT.value, type=int, default=8080, metavar="N", help=txt.arg_port)
+    standin_parser.add_argument(SubArgs.PAGE_SIZE.value, type=int, default=standin.PAGE_SIZE, metavar="N", help=txt.arg_page_size)
+    standin_parser.add_argument(SubArgs.LATENCY.value, type=float, default=0.0, metavar="SECONDS", help=txt.arg_latency)
+    standin_parser.add_argument(SubArgs.THROTTLE.value, type=int, default=0, metavar="BYTES", help=txt.arg_throttle)
+    standin_parser.add_argument(SubArgs.ERROR_RATE.value, type=float, default=0.0, metavar="P", help=txt.arg_error_rate)
+    standin_parser.add_argument(SubArgs.ERROR_STATUS.value, type=int, default=standin.ERROR_STATUS, metavar="CODE", help=txt.arg_error_status)
+    standin_parser.add_argument(SubArgs.RATE_LIMIT.value, type=float, default=0.0, metavar="N", help=txt.arg_rate_limit)
 
     # fmt: on
 
@@ -76,43 +202,169 @@ def main():
 
     # ---------------------------------- ROUTING --------------------------------- #
 
-    # Match all three possible operations
+    # Fetch from a local stand-in rather than YouTube
+    if getattr(args, "source", None) is not None:
+        dump.SOURCE, dump.SOURCE_IE = args.source.rstrip("/"), standin.StandinPlaylistIE
+
+    # Machine-readable numbers, for scheduled runs
+    if (getattr(args, "metrics", None) is not None) or (getattr(args, "statsd", None) is not None):
+        metrics.configure(textfile=args.metrics, statsd=args.statsd)
+
+    # Pace requests, as many in flight as there are threads fetching. Opt-in, `yt_dlp` sets the pace otherwise.
+    if (getattr(args, "fetch_state", None) is not None) or (getattr(args, "budget", None) is not None):
+        dump.SCHEDULER = scheduler.Scheduler(
+            args.fetch_state, jobs=getattr(args, "jobs", 1), budgets=dict(args.budget or [])
+        )
+        # Whatever was learned is worth keeping, especially if we got throttled into failing
+        atexit.register(dump.SCHEDULER.save)
+
+    # Match all possible operations
     match args.operation:
         case Operation.DUMP.value:
             print(txt.dump_section)
+
+            refresh_base = None
+            if args.refresh_base is not None:
+                try:
+                    with open(args.refresh_base, "r", encoding="utf-8") as f:
+                        refresh_base = diff.read(f)
+                        print(txt.message_upstream_read_archive_base.format(path=args.refresh_base))
+                except FileNotFoundError:
+                    print(txt.err_file_read.format(file_path=args.refresh_base))
+                    txt.error_handler()
+
+                if refresh_base["playlist_id"] != args.id:
+                    print(txt.err_refresh_base_id.format(path=args.refresh_base, id=args.id))
+                    txt.error_handler()
+
+            # Videos of the last snapshot aren't new, no need to enrich them
+            enrich_since = None
+            if args.enrich is not None:
+                if refresh_base is not None:
+                    enrich_since = {row[1] for row in refresh_base["data"]}
+                elif args.archive_root is not None:
+                    enrich_since = archive.latest_ids(args.archive_root, args.id)
+
             print(txt.message_dump_fetching_playlist.format(id=args.id))
 
+            # Progress is checkpointed next to where the archive will end up
+            checkpoint_dir = args.archive_root or os.path.dirname(args.output or "") or "."
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            checkpoint = dump.checkpoint_path(args.id, checkpoint_dir)
+
             # The playlist isn't immediately dumped into a file, but kept in ram in a `StringIO`
             # This is useful when we only want to diff without dumping (so in the next `case`).
+            started = time.perf_counter()
             strio, default_file_path = dump.dump(
                 args.id,
                 browser=args.browser,
+                chunk_size=args.chunk_size,
+                checkpoint=checkpoint,
+                base=refresh_base,
+                verify_every=args.verify_every,
+                enrich_cache=args.enrich,
+                enrich_since=enrich_since,
+                enrich_jobs=args.enrich_jobs,
+                enrich_rate=args.enrich_rate,
             )
+            print(txt.message_dump_fetch_time.format(seconds=time.perf_counter() - started))
 
             # If a path was provided by the user, override the default one
             file_path = args.output if args.output is not None else default_file_path
 
             # Attempt to write the dump to the disk
             try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(strio.getvalue())
-                    print(txt.message_dump_playlist_dumped.format(path=file_path))
+                # Let the archive root decide where the snapshot goes (report the root itself if that fails)
+                if args.archive_root is not None:
+                    file_path = args.archive_root
+                    file_path = archive.store(args.archive_root, strio)
+                else:
+                    archive.write_atomic(file_path, strio.getvalue())
+                print(txt.message_dump_playlist_dumped.format(path=file_path))
+                metrics.written(strio, file_path)
+                # Only now that the archive is on the disk, the partial file has served its purpose
+                dump.remove_checkpoint(checkpoint)
             except IOError:
                 print(txt.err_file_write.format(file_path=file_path))
+                metrics.inc("failures_total", reason="write", playlist=args.id)
+
+        case Operation.CHANNEL.value:
+            print(txt.channel_section)
+
+            playlists = dump.channel_playlists(args.id, browser=args.browser)
+            print(txt.message_channel_found_playlists.format(id=args.id, count=len(playlists)))
+
+            output_dir = args.archive_root or args.output
+            os.makedirs(output_dir, exist_ok=True)
+
+            playlist_dicts = dump.dump_channel(
+                playlists,
+                browser=args.browser,
+                jobs=args.jobs,
+                chunk_size=args.chunk_size,
+                checkpoint_dir=output_dir,
+            )
+
+            # Playlists that couldn't be fetched are only listed in the index
+            fetched = [playlist_dict for playlist_dict in playlist_dicts if "error" not in playlist_dict]
+
+            # All at once, so that videos shared between playlists are only enriched once
+            if args.enrich is not None:
+                since = {}
+                if args.archive_root is not None:
+                    for playlist_dict in fetched:
+                        since[playlist_dict["id"]] = (
+                            archive.latest_ids(args.archive_root, playlist_dict["id"]) or set()
+                        )
+                dump.enrich_playlists(
+                    fetched,
+                    args.enrich,
+                    since=since,
+                    browser=args.browser,
+                    jobs=args.enrich_jobs,
+                    rate=args.enrich_rate,
+                )
+
+            paths = []
+            for playlist_dict in playlist_dicts:
+                if "error" in playlist_dict:
+                    paths.append(None)
+                    continue
+                strio, file_name = dump.render(playlist_dict)
+                try:
+                    if args.archive_root is not None:
+                        file_path = archive.store(args.archive_root, strio)
+                    else:
+                        # Playlist titles can contain anything
+                        file_path = os.path.join(output_dir, file_name.replace(os.sep, "_"))
+                        archive.write_atomic(file_path, strio.getvalue())
+                    print(txt.message_channel_playlist_dumped.format(path=file_path))
+                    metrics.written(strio, file_path)
+                    dump.remove_checkpoint(dump.checkpoint_path(playlist_dict["id"], output_dir))
+                except IOError:
+                    print(txt.err_file_write.format(file_path=output_dir))
+                    metrics.inc("failures_total", reason="write", playlist=playlist_dict["id"])
+                    file_path = None
+                paths.append(file_path)
+
+            index_path = os.path.join(output_dir, f"{args.id}.index.json")
+            dump.write_channel_index(index_path, args.id, playlist_dicts, paths)
+            print(txt.message_channel_index_written.format(path=index_path))
 
         case Operation.UPSTREAM.value:
             print(txt.upstream_fetch_section)
 
-            # Try reading the archive
+            # Only the metadata for now, the rest is read while fetching
             try:
                 with open(args.diff_base, "r", encoding="utf-8") as f:
-                    base = diff.read(f)
-                    print(txt.message_upstream_read_archive_base.format(path=args.diff_base))
+                    header = diff.read_header(f)
+                print(txt.message_upstream_read_archive_base.format(path=args.diff_base))
             except FileNotFoundError:
                 print(txt.err_file_read.format(file_path=args.diff_base))
+                metrics.inc("failures_total", reason="read")
                 txt.error_handler()
 
-            playlist_id = args.id_override if (args.id_override is not None) else base["playlist_id"]
+            playlist_id = args.id_override if (args.id_override is not None) else header["playlist_id"]
             print(
                 txt.message_dump_id_override.format(id=playlist_id)
                 if (args.id_override is not None)
@@ -120,33 +372,233 @@ def main():
             )
 
             print(txt.message_upstream_fetching_playlist.format(id=playlist_id))
-            upstream_dump, _ = dump.dump(
-                playlist_id,
-                browser=args.browser,
-            )
+            base, against, recovered = pipeline.up_diff(args.diff_base, playlist_id, browser=args.browser)
             print(txt.message_upstream_fetched_playlist)
 
-            upstream_dump.seek(0)  # Reset the cursor to read from the beginning
-            against = diff.read(upstream_dump)
+            fallback = kb.fallback(args.kb) if (args.kb is not None) else None
 
-            diff.diff(base, against)
+            try:
+                metrics.diffed(playlist_id, diff.diff(base, against, fallback=fallback, recovered=recovered))
+            finally:
+                lazy.close(base)
 
         case Operation.LOCAL.value:
+            # Only the videos that were lost are ever fully decoded
             try:
-                with open(args.diff_base, "r", encoding="utf-8") as f:
-                    base = diff.read(f)
+                base = lazy.read(args.diff_base)
             except FileNotFoundError:
                 print(txt.err_file_read.format(file_path=args.diff_base))
+                metrics.inc("failures_total", reason="read")
                 txt.error_handler()
 
             try:
-                with open(args.diff_with, "r", encoding="utf-8") as f:
-                    against = diff.read(f)
+                against = lazy.read(args.diff_with)
             except FileNotFoundError:
                 print(txt.err_file_read.format(file_path=args.diff_with))
+                metrics.inc("failures_total", reason="read")
+                txt.error_handler()
+
+            fallback = kb.fallback(args.kb) if (args.kb is not None) else None
+
+            try:
+                metrics.diffed(against["playlist_id"], diff.diff(base, against, fallback=fallback))
+            finally:
+                lazy.close(base)
+                lazy.close(against)
+
+        case Operation.LATEST.value:
+            # Resolved from the manifest, no need to scan the archive root
+            snapshots = archive.latest(args.archive_root, args.id, count=2)
+            if len(snapshots) < 2:
+                print(txt.err_not_enough_snapshots.format(id=args.id, root=args.archive_root))
+                txt.error_handler()
+
+            try:
+                base = lazy.read(snapshots[0])
+                against = lazy.read(snapshots[1])
+            except FileNotFoundError as e:
+                print(txt.err_file_read.format(file_path=e.filename))
+                metrics.inc("failures_total", reason="read")
+                txt.error_handler()
+
+            fallback = kb.fallback(args.kb) if (args.kb is not None) else None
+
+            try:
+                metrics.diffed(args.id, diff.diff(base, against, fallback=fallback))
+            finally:
+                lazy.close(base)
+                lazy.close(against)
+
+        case Operation.STATS.value:
+            # Only the paths are gathered here, snapshots are streamed one at a time by `stats.compute`
+            if args.archive_root is not None:
+                paths = archive.snapshots(args.archive_root, args.id)
+            else:
+                paths = archive.series(args.archives, args.id)
+            if len(paths) == 0:
+                print(txt.err_no_snapshots.format(id=args.id, path=args.archive_root or args.archives))
+                txt.error_handler()
+
+            try:
+                rot = stats.compute(paths, jobs=args.jobs)
+            except FileNotFoundError as e:
+                print(txt.err_file_read.format(file_path=e.filename))
+                txt.error_handler()
+            except ValueError as e:
+                print(txt.err_file_malformed.format(file_path=e.args[0]))
+                metrics.inc("failures_total", reason="read")
+                txt.error_handler()
+
+            print(txt.stats_section)
+            print(
+                txt.message_stats_streamed.format(
+                    count=len(paths),
+                    id=args.id,
+                    first=rot["snapshots"][0]["archived_on"],
+                    last=rot["snapshots"][-1]["archived_on"],
+                )
+            )
+            stats.summary(rot, top=args.top)
+
+            if args.output is not None:
+                for path in stats.export(rot, args.output):
+                    print(txt.message_stats_exported.format(path=path))
+
+        case Operation.BATCH.value:
+            # Only the two latest snapshots of each playlist are needed
+            if args.archive_root is not None:
+                manifest = archive.load_manifest(args.archive_root)
+                pairs = {
+                    playlist_id: archive.latest(args.archive_root, playlist_id, count=2, manifest=manifest)
+                    for playlist_id in manifest["playlists"]
+                }
+            else:
+                pairs = archive.every_series(args.archives)
+
+            try:
+                changes, rows = batch.classify(pairs, jobs=args.jobs)
+            except FileNotFoundError as e:
+                print(txt.err_file_read.format(file_path=e.filename))
+                txt.error_handler()
+            except ValueError as e:
+                print(txt.err_file_malformed.format(file_path=e.args[0]))
+                metrics.inc("failures_total", reason="read")
+                txt.error_handler()
+
+            diffed = sum(1 for paths in pairs.values() if len(paths) >= 2)
+            print(txt.batch_section)
+            print(txt.message_batch_diffed.format(playlists=diffed, rows=rows, skipped=len(pairs) - diffed))
+            batch.summary(changes)
+
+            if args.output is not None:
+                print(txt.message_stats_exported.format(path=batch.export(changes, args.output)))
+
+        case Operation.COMPACT.value:
+            if args.archive_root is not None:
+                paths = archive.snapshots(args.archive_root, args.id)
+            else:
+                # Previous compacted archives are folded in as well
+                paths = archive.series(args.archives, args.id, compacted=True)
+            if len(paths) == 0:
+                print(txt.err_no_snapshots.format(id=args.id, path=args.archive_root or args.archives))
+                txt.error_handler()
+
+            try:
+                strio = compact.compact(paths)
+            except FileNotFoundError as e:
+                print(txt.err_file_read.format(file_path=e.filename))
+                txt.error_handler()
+            except ValueError as e:
+                print(txt.err_file_malformed.format(file_path=e.args[0]))
+                metrics.inc("failures_total", reason="read")
+                txt.error_handler()
+
+            file_path = args.output or f"{args.id} - compacted.csv"
+            try:
+                archive.write_atomic(file_path, strio.getvalue())
+            except IOError:
+                print(txt.err_file_write.format(file_path=file_path))
+                txt.error_handler()
+
+            strio.seek(0)
+            print(txt.compact_section)
+            print(
+                txt.message_compacted.format(
+                    count=len(paths), rows=diff.read_header(strio)["rows"], path=file_path
+                )
+            )
+
+        case Operation.BENCH_LOAD.value:
+            paths = verify.expand([args.archives])
+            jobs = args.jobs or os.cpu_count() or 1
+
+            print(txt.bench_section)
+            print(txt.message_bench_loading.format(count=len(paths), jobs=jobs))
+
+            loader.summary(loader.benchmark(paths, max_jobs=jobs))
+
+        case Operation.VERIFY.value:
+            print(txt.verify_section)
+
+            results = verify.verify(args.archives, jobs=args.jobs)
+
+            problems = {
+                verify.VerifyResult.ROWS: txt.verify_problem_rows,
+                verify.VerifyResult.CHECKSUM: txt.verify_problem_checksum,
+                verify.VerifyResult.UNREADABLE: txt.verify_problem_unreadable,
+            }
+            for path, result, expected, found in results:
+                if result in problems:
+                    problem = problems[result].format(expected=expected, found=found)
+                    print(txt.message_verify_failed.format(path=path, problem=problem))
+
+            ok = sum(1 for result in results if result[1] is verify.VerifyResult.OK)
+            unchecked = sum(1 for result in results if result[1] is verify.VerifyResult.UNCHECKED)
+            corrupt = len(results) - ok - unchecked
+            print(
+                txt.message_verify_done.format(
+                    count=len(results), ok=ok, unchecked=unchecked, corrupt=corrupt
+                )
+            )
+
+            # Lets scheduled jobs notice
+            if corrupt > 0:
                 txt.error_handler()
 
-            diff.diff(base, against)
+        case Operation.SERVE.value:
+            print(txt.serve_section)
+
+            server.serve(args.archives, port=args.port, interval=args.refresh, jobs=args.jobs)
+
+        case Operation.STANDIN.value:
+            print(txt.standin_section)
+
+            try:
+                standin.serve(
+                    args.recording,
+                    port=args.port,
+                    page_size=args.page_size,
+                    latency=args.latency,
+                    throttle=args.throttle,
+                    error_rate=args.error_rate,
+                    error_status=args.error_status,
+                    rate_limit=args.rate_limit,
+                )
+            except ValueError as e:
+                print(txt.err_file_malformed.format(file_path=e.args[0]))
+                txt.error_handler()
+
+        case Operation.KB.value:
+            print(txt.kb_section)
+            print(txt.message_kb_building.format(path=args.archives))
+
+            if args.watch:
+                kb.follow(args.archives, args.kb, jobs=args.jobs, poll=args.poll)
+            else:
+                ingested, count = kb.build(args.archives, args.kb, jobs=args.jobs)
+                print(txt.message_kb_built.format(ingested=ingested, count=count, path=args.kb))
+
+    metrics.succeeded(args.operation)
 
 
 if __name__ == "__main__":
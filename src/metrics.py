@@ -0,0 +1,258 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Metrics for the script, for scheduled runs to be monitored without parsing the output.
+
+Two sinks are supported, both optional :
+    * A Prometheus textfile (text exposition format), e.g. for the textfile collector of `node_exporter`. It is rewritten
+      atomically when the script exits, counters and histograms carrying on from the values already in it.
+    * StatsD, each event being sent right away as one UDP datagram. Labels become tags, DogStatsD style.
+Until `configure` is called, recording anything returns right away.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import io
+import os
+import time
+import atexit
+import socket
+import threading
+import contextlib
+
+# Should be safe as long as the script is distributed as a zipapp
+import diff
+import archive
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Prepended to the name of every metric
+PREFIX = "ytpd_"
+# Upper bounds of the buckets of the fetch duration histogram, in seconds
+DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# Used when `--statsd` doesn't specify a port
+STATSD_PORT = 8125
+
+# Name --> (type, help)
+METRICS = {
+    "fetch_duration_seconds": ("histogram", "Time spent fetching a playlist."),
+    "rows_written_total": ("counter", "Videos written to archives."),
+    "bytes_written_total": ("counter", "Bytes written to archives."),
+    "unavailable_videos": ("gauge", "Unavailable videos found by the last diff of the playlist."),
+    "newly_unavailable_videos_total": (
+        "counter",
+        "Videos found unavailable that weren't in the base archive.",
+    ),
+    "recovered_videos_total": ("counter", "Unavailable videos whose metadata was recovered."),
+    "failures_total": ("counter", "Fetches, reads and writes that failed."),
+    "last_success_timestamp_seconds": ("gauge", "Unix time of the last successful run of the operation."),
+}
+
+_textfile = None
+# (socket, address)
+_statsd = None
+# (name, labels) --> value, or [cumulative bucket counts..., sum] for histograms
+_values = {}
+_lock = threading.Lock()
+
+
+def configure(textfile: str = None, statsd: str = None):
+    """Enable the sinks.
+
+    Args:
+        textfile (str, optional): Path to the Prometheus textfile, written when the script exits. Defaults to None.
+        statsd (str, optional): Address of the StatsD server, `host[:port]`. Defaults to None.
+    """
+    global _textfile, _statsd
+
+    if textfile is not None:
+        _textfile = textfile
+        atexit.register(flush)
+    if statsd is not None:
+        host, _, port = statsd.rpartition(":") if (":" in statsd) else (statsd, "", "")
+        _statsd = (
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM),
+            (host or "127.0.0.1", int(port or STATSD_PORT)),
+        )
+
+
+def enabled() -> bool:
+    """Whether anything is recorded at all."""
+    return (_textfile is not None) or (_statsd is not None)
+
+
+def _format(value: float) -> str:
+    """Integers without a trailing `.0`, so that large counters stay exact."""
+    return str(int(value)) if (value == int(value)) else repr(float(value))
+
+
+def _send(name: str, value: float, kind: str, labels: dict):
+    """Send one event to StatsD, losing it silently if that fails."""
+    tags = ",".join(f"{key}:{value}" for key, value in labels.items())
+    line = f"{PREFIX}{name}:{_format(value)}|{kind}" + (f"|#{tags}" if (tags != "") else "")
+    with contextlib.suppress(OSError):
+        _statsd[0].sendto(line.encode("utf-8"), _statsd[1])
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Increment a counter."""
+    if (_textfile is None) and (_statsd is None):
+        return
+
+    if _statsd is not None:
+        _send(name, value, "c", labels)
+    with _lock:
+        key = (name, tuple(sorted(labels.items())))
+        _values[key] = _values.get(key, 0) + value
+
+
+def gauge(name: str, value: float, **labels):
+    """Set a gauge."""
+    if (_textfile is None) and (_statsd is None):
+        return
+
+    if _statsd is not None:
+        _send(name, value, "g", labels)
+    with _lock:
+        _values[(name, tuple(sorted(labels.items())))] = value
+
+
+def observe(name: str, value: float, **labels):
+    """Add an observation to a histogram, in seconds."""
+    if (_textfile is None) and (_statsd is None):
+        return
+
+    if _statsd is not None:
+        _send(name, value * 1000, "ms", labels)
+    with _lock:
+        key = (name, tuple(sorted(labels.items())))
+        buckets = _values.setdefault(key, [0] * (len(DURATION_BUCKETS) + 2))
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+        # +Inf, then the sum
+        buckets[-2] += 1
+        buckets[-1] += value
+
+
+def written(strio: io.StringIO, path: str):
+    """Record an archive written to the disk.
+
+    Args:
+        strio (io.StringIO): The archive, as returned by `dump.dump`.
+        path (str): Where it was written.
+    """
+    if not enabled():
+        return
+
+    strio.seek(0)
+    header = diff.read_header(strio)
+    inc("rows_written_total", int(header.get("rows", 0)), playlist=header.get("playlist_id", ""))
+    inc("bytes_written_total", os.path.getsize(path), playlist=header.get("playlist_id", ""))
+
+
+def diffed(playlist_id: str, recovered: dict | None):
+    """Record the results of a diff.
+
+    Args:
+        playlist_id (str): YouTube ID of the playlist.
+        recovered (dict | None): As returned by `diff.diff`, `None` if the diff was aborted.
+    """
+    if (not enabled()) or (recovered is None):
+        return
+
+    # Same categories as `diff._analyse`
+    found = [found for (_, found) in recovered.values()]
+    gauge("unavailable_videos", len(found), playlist=playlist_id)
+    inc("newly_unavailable_videos_total", sum(1 for f in found if f is False), playlist=playlist_id)
+    inc("recovered_videos_total", sum(1 for f in found if type(f) is not bool), playlist=playlist_id)
+
+
+def succeeded(operation: str):
+    """Record the end of an operation, as a success unless a failure was recorded along the way."""
+    with _lock:
+        failed = any(name == "failures_total" for (name, _) in _values)
+    if not failed:
+        gauge("last_success_timestamp_seconds", int(time.time()), operation=operation)
+
+
+def _series(name: str, labels: tuple) -> str:
+    """Name and labels of one sample, in the text exposition format."""
+    if len(labels) == 0:
+        return PREFIX + name
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return PREFIX + name + "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _samples() -> dict:
+    """Every sample recorded, series --> (metric, value)."""
+    out = {}
+
+    with _lock:
+        for (name, labels), value in _values.items():
+            if METRICS[name][0] != "histogram":
+                out[_series(name, labels)] = (name, value)
+                continue
+            for bound, count in zip((*DURATION_BUCKETS, "+Inf"), value[:-1]):
+                out[_series(name + "_bucket", (*labels, ("le", str(bound))))] = (name, count)
+            out[_series(name + "_sum", labels)] = (name, value[-1])
+            out[_series(name + "_count", labels)] = (name, value[-2])
+
+    return out
+
+
+def _read_textfile(path: str) -> dict:
+    """Samples already in the textfile, series --> value."""
+    out = {}
+
+    with contextlib.suppress(FileNotFoundError):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or (line.strip() == ""):
+                    continue
+                series, _, value = line.rstrip("\n").rpartition(" ")
+                with contextlib.suppress(ValueError):
+                    out[series] = float(value)
+
+    return out
+
+
+def flush():
+    """Write the textfile, carrying on from the values already in it."""
+    if _textfile is None:
+        return
+
+    # Series --> metric, for the samples of previous runs
+    families = {}
+    for name, (kind, _) in METRICS.items():
+        for suffix in ("_bucket", "_sum", "_count") if (kind == "histogram") else ("",):
+            families[PREFIX + name + suffix] = name
+
+    samples = {}
+    for series, value in _read_textfile(_textfile).items():
+        name = families.get(series.partition("{")[0])
+        if name is not None:
+            samples[series] = (name, value)
+    for series, (name, value) in _samples().items():
+        previous = samples.get(series, (name, 0))[1]
+        samples[series] = (name, value if (METRICS[name][0] == "gauge") else previous + value)
+
+    out = io.StringIO()
+    for name, (kind, description) in METRICS.items():
+        family = [(series, value) for (series, (metric, value)) in samples.items() if metric == name]
+        if len(family) == 0:
+            continue
+        out.write(f"# HELP {PREFIX}{name} {description}\n# TYPE {PREFIX}{name} {kind}\n")
+        for series, value in family:
+            out.write(f"{series} {_format(value)}\n")
+
+    os.makedirs(os.path.dirname(os.path.abspath(_textfile)), exist_ok=True)
+    archive.write_atomic(_textfile, out.getvalue())
+
+
+# ------------------------------------- . ------------------------------------ #
@@ -61,7 +61,7 @@ SCRIPT_NAME = "script.pyz"
 
 
 class Operation(Enum):
-    """Simple enum to abstract on the three operations that this script supports.
+    """Simple enum to abstract on the operations that this script supports.
 
     Attributes:
         _: Each operation (enum variant) has a value equal to its user-facing text representation.
@@ -70,10 +70,20 @@ class Operation(Enum):
     DUMP = "dump"
     UPSTREAM = "up-diff"
     LOCAL = "local-diff"
+    KB = "kb-build"
+    LATEST = "latest-diff"
+    CHANNEL = "channel"
+    STANDIN = "standin"
+    STATS = "stats"
+    VERIFY = "verify"
+    COMPACT = "compact"
+    BENCH_LOAD = "bench-load"
+    SERVE = "serve"
+    BATCH = "batch-diff"
 
 
 class SubArgs(Enum):
-    """Simple enum to abstract on the six arguments accepted by the three subparsers.
+    """Simple enum to abstract on the arguments accepted by the subparsers.
 
     Attributes:
         _: Each argument (enum variant) has a value equal to its user-facing text representation.
@@ -85,6 +95,33 @@ class SubArgs(Enum):
     DIFF_BASE = "--diff-base"
     DIFF_WITH = "--diff-with"
     ID_OVERRIDE = "--id-override"
+    ARCHIVES = "--archives"
+    KB = "--kb"
+    JOBS = "--jobs"
+    ARCHIVE_ROOT = "--archive-root"
+    CHUNK_SIZE = "--chunk-size"
+    REFRESH_BASE = "--refresh-base"
+    VERIFY_EVERY = "--verify-every"
+    ENRICH = "--enrich"
+    ENRICH_JOBS = "--enrich-jobs"
+    ENRICH_RATE = "--enrich-rate"
+    SOURCE = "--source"
+    RECORDING = "--recording"
+    PORT = "--port"
+    PAGE_SIZE = "--page-size"
+    LATENCY = "--latency"
+    THROTTLE = "--throttle"
+    ERROR_RATE = "--error-rate"
+    ERROR_STATUS = "--error-status"
+    TOP = "--top"
+    REFRESH = "--refresh"
+    WATCH = "--watch"
+    POLL = "--poll"
+    FETCH_STATE = "--fetch-state"
+    BUDGET = "--budget"
+    RATE_LIMIT = "--rate-limit"
+    METRICS = "--metrics"
+    STATSD = "--statsd"
 
 
 arg_desc = (
@@ -106,12 +143,43 @@ arg_epilog = (
     + "|  * Diff two local archives\n"
     + f"|    > {SCRIPT_NAME} {Operation.LOCAL.value} {SubArgs.DIFF_BASE.value} ./dusty_old_archive.csv {SubArgs.DIFF_WITH.value} ./shiny_new_archive.csv \n"
     + "|\n"
+    + "|  * Dump a playlist into a managed archive root, then diff its two latest snapshots\n"
+    + f"|    > {SCRIPT_NAME} {Operation.DUMP.value} {SubArgs.ID.value} LOremipSUmdolOrsiTamEtConseCtETuRA {SubArgs.ARCHIVE_ROOT.value} ./archives\n"
+    + f"|    > {SCRIPT_NAME} {Operation.LATEST.value} {SubArgs.ID.value} LOremipSUmdolOrsiTamEtConseCtETuRA {SubArgs.ARCHIVE_ROOT.value} ./archives\n"
+    + "|\n"
+    + "|  * Dump every playlist of a channel\n"
+    + f"|    > {SCRIPT_NAME} {Operation.CHANNEL.value} {SubArgs.ID.value} @RickAstleyYT {SubArgs.ARCHIVE_ROOT.value} ./archives\n"
+    + "|\n"
+    + "|  * Build a knowledge base from all your archives, and use it when diffing\n"
+    + f"|    > {SCRIPT_NAME} {Operation.KB.value} {SubArgs.ARCHIVES.value} ./archives {SubArgs.KB.value} ./kb.json\n"
+    + f"|    > {SCRIPT_NAME} {Operation.UPSTREAM.value} {SubArgs.DIFF_BASE.value} ./trendy_memes.csv {SubArgs.KB.value} ./kb.json\n"
+    + "|\n"
 )
 
 
 arg_operation_dump = "Dump the playlist into a CSV archive."
 arg_operation_upstream = "Fetch upstream and perform a diff with your local archive."
 arg_operation_local = "Perform a local diff between two archives."
+arg_operation_channel = "Dump every playlist of a channel into CSV archives."
+arg_operation_latest = "Diff the two latest snapshots of a playlist stored in an archive root."
+arg_operation_standin = (
+    "Serve recorded playlists over HTTP as a local stand-in for YouTube, to load-test fetching offline."
+)
+arg_operation_stats = (
+    "Compute how fast a playlist rots over its snapshot history, and export the time series."
+)
+arg_operation_verify = (
+    "Check archives against the row count and checksum in their header, to catch truncated or altered files."
+)
+arg_operation_compact = "Merge the snapshots of a playlist into a single archive, usable as a diff base."
+arg_operation_bench_load = "Benchmark parallel archive loading with 1 to N worker processes."
+arg_operation_serve = (
+    "Answer video lookups and diffs over a local HTTP/JSON API, from archives kept in memory."
+)
+arg_operation_batch = "Diff the two latest snapshots of many playlists at once, telling videos moved or copied between them from removed ones."
+arg_operation_kb = (
+    "Build a knowledge base out of every archive in a directory, for use as a fallback when diffing."
+)
 
 arg_id = "YouTube ID of the playlist to dump\nE.g. : `LOremipSUmdolOrsiTamEtConseCtETuRA`."
 arg_id_override = f"YouTube ID of the playlist to fetch. This should be detected automatically using the archive provided in `{SubArgs.DIFF_BASE.value}`."
@@ -119,6 +187,58 @@ arg_browser = "Browser to use for session cookies (required to access private pl
 arg_diff_base = "Path to your existing archive in CSV format\nE.g. : `./dusty_old_archive.csv`."
 arg_path = "Customize the path (and name) of the output archive\nE.g. : `./folder/my_shiny_new_archive.csv`."
 arg_diff_with = "Path to the most recent of the two archives you want to diff."
+arg_archives = "Directory containing your archives, searched recursively\nE.g. : `./archives`."
+arg_kb = "Path to the knowledge base (JSON), created if needed\nE.g. : `./kb.json`."
+arg_kb_fallback = f"Path to a knowledge base built with `{Operation.KB.value}`, used to recover videos missing from `{SubArgs.DIFF_BASE.value}`."
+arg_archive_root = f"Managed archive root, where snapshots are stored and indexed by playlist ID (replaces `{SubArgs.OUTPUT.value}`)\nE.g. : `./archives`."
+arg_id_latest = "YouTube ID of the playlist to diff\nE.g. : `LOremipSUmdolOrsiTamEtConseCtETuRA`."
+arg_id_stats = "YouTube ID of the playlist to analyse\nE.g. : `LOremipSUmdolOrsiTamEtConseCtETuRA`."
+arg_archive_root_stats = f"Managed archive root holding the snapshots of the playlist (see `{Operation.DUMP.value} {SubArgs.ARCHIVE_ROOT.value}`)\nE.g. : `./archives`."
+arg_archives_stats = "Directory containing archives of the playlist, searched recursively. Archives of other playlists are ignored\nE.g. : `./archives`."
+arg_stats_output = "Export the time series. A `.json` path gets a single JSON file, any other path one CSV file per table\nE.g. : `./rot.csv`, `./rot.json`."
+arg_top = "Number of channels shown in the summary.\nDefaults to 10."
+arg_archive_root_batch = f"Managed archive root holding the snapshots of the playlists (see `{Operation.DUMP.value} {SubArgs.ARCHIVE_ROOT.value}`)\nE.g. : `./archives`."
+arg_archives_batch = (
+    "Directory containing archives of the playlists, searched recursively\nE.g. : `./archives`."
+)
+arg_batch_output = "Export every change, additions included. A `.json` path gets a JSON file, any other path a CSV file\nE.g. : `./changes.csv`, `./changes.json`."
+arg_archives_verify = "Archives to check, and/or directories containing them (searched recursively)\nE.g. : `./archives`, `./a.csv ./b.csv`."
+arg_id_compact = "YouTube ID of the playlist to compact\nE.g. : `LOremipSUmdolOrsiTamEtConseCtETuRA`."
+arg_compact_output = (
+    "Customize the path (and name) of the compacted archive\nDefaults to `<playlist_id> - compacted.csv`."
+)
+arg_archives_bench = "Directory containing the archives to load, searched recursively\nE.g. : `./archives`."
+arg_jobs_bench = "Highest number of worker processes to try.\nDefaults to one per CPU."
+arg_archives_serve = "Directory containing your archives, searched recursively. New archives are picked up as they appear\nE.g. : `./archives`."
+arg_port_serve = "Port to listen on.\nDefaults to 8000."
+arg_refresh = "Seconds between two looks for new archives, where inotify isn't available.\nDefaults to 30."
+arg_watch = "Keep running, and ingest new or modified archives as they land in the directory."
+arg_poll = "Poll the directory for changes, even where inotify is available (e.g. for network filesystems)."
+arg_chunk_size = "Number of videos fetched between two checkpoints. An interrupted dump resumes from the last complete chunk.\nDefaults to 500."
+arg_refresh_base = "Previous archive of the playlist. Fetching stops as soon as the playlist lines up with it, and the rest is copied over.\nMeant for playlists where new videos are added to the top.\nE.g. : `./dusty_old_archive.csv`."
+arg_verify_every = f"Maximum number of incremental refreshes in a row with `{SubArgs.REFRESH_BASE.value}`, the playlist is then fetched in full to catch videos that went unavailable.\nDefaults to 10."
+arg_enrich = "Path to the enrichment cache (JSON), created if needed. Fetches the duration, upload date and description of videos added since the last snapshot, and adds them to the archive.\nE.g. : `./enrich_cache.json`."
+arg_enrich_jobs = "Number of videos enriched concurrently.\nDefaults to 4."
+arg_enrich_rate = "Maximum number of videos enriched per second.\nDefaults to 2, 0 for unlimited."
+arg_channel_id = "Handle or ID of the channel\nE.g. : `@RickAstleyYT`, `UCuAXFkgsw1L7xaCfnd5JJOw`."
+arg_channel_output = (
+    "Directory for the archives (one per playlist) and the index of the channel\nE.g. : `./channel_archives`."
+)
+arg_channel_jobs = "Number of playlists fetched concurrently.\nDefaults to 4."
+arg_source = f"Fetch from a local stand-in started with `{Operation.STANDIN.value}` instead of YouTube\nE.g. : `http://127.0.0.1:8080`."
+arg_recording = "Archive, or directory of archives, holding the playlists to serve\nE.g. : `./archives`."
+arg_port = "Port to listen on.\nDefaults to 8080."
+arg_page_size = "Number of videos per page, each page being one request.\nDefaults to 100, like YouTube."
+arg_latency = "Delay before answering each request, in seconds.\nDefaults to 0."
+arg_throttle = "Maximum bandwidth per response, in bytes per second.\nDefaults to 0, i.e. unlimited."
+arg_error_rate = "Probability of answering a request with an error, between 0 and 1.\nDefaults to 0."
+arg_fetch_state = "Pace requests while fetching, and keep the request rates learned so that the next run starts from them\nE.g. : `./fetch_state.json`."
+arg_budget = "Pace requests while fetching, with at most that many requests per second to a host, can be repeated\nE.g. : `www.youtube.com=2`."
+arg_rate_limit = "Requests per second past which requests are answered with an error, like YouTube throttling.\nDefaults to 0, i.e. unlimited."
+arg_metrics = "Prometheus textfile to record metrics in (fetch durations, rows and bytes written, lost and recovered videos, failures), e.g. for `node_exporter`\nE.g. : `/var/lib/node_exporter/yt_playlist_diff.prom`."
+arg_statsd = "StatsD server to send metrics to, over UDP\nE.g. : `127.0.0.1:8125`."
+arg_error_status = "Status code of injected errors.\nDefaults to 429."
+arg_jobs = "Number of worker processes. Defaults to one per CPU."
 
 # ---------------------------------------------------------------------------- #
 #                                    FORMAT                                    #
@@ -135,6 +255,15 @@ separator_line = "\n" + Style.BRIGHT + "----------------------------------------
 #                                ERRORS/WARNINGS                               #
 # ---------------------------------------------------------------------------- #
 
+enum_import_error = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " Could not import module `enum`. Please check that your python version is >= 3.4."
+    + RS
+)
+
 err_generic_module_import = (
     Fore.RED
     + Style.BRIGHT
@@ -188,6 +317,21 @@ err_file_read = (
     + RS
 )
 
+err_file_malformed = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " Could not parse "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{file_path}"
+    + Style.NORMAL
+    + Fore.RED
+    + ", it doesn't look like a valid archive. Try `verify` on it."
+    + RS
+)
+
 err_file_write = (
     Fore.RED
     + Style.BRIGHT
@@ -203,6 +347,112 @@ err_file_write = (
     + RS
 )
 
+err_dump_fetch_failed = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " Could not fetch the playlist after "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{retries}"
+    + Style.NORMAL
+    + Fore.RED
+    + " attempts. "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + Fore.RED
+    + " video(s) were fetched, run the same command again to resume."
+    + RS
+)
+
+err_refresh_base_id = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{path}"
+    + Style.NORMAL
+    + Fore.RED
+    + " is not an archive of playlist "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{id}"
+    + Style.NORMAL
+    + Fore.RED
+    + ", it can't be refreshed."
+    + RS
+)
+
+err_no_snapshots = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " No snapshot of playlist "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{id}"
+    + Style.NORMAL
+    + Fore.RED
+    + " found in "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{path}"
+    + Style.NORMAL
+    + Fore.RED
+    + "."
+    + RS
+)
+
+err_not_enough_snapshots = (
+    Fore.RED
+    + Style.BRIGHT
+    + "[Err]"
+    + Style.NORMAL
+    + " Playlist "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{id}"
+    + Style.NORMAL
+    + Fore.RED
+    + " needs at least two snapshots in "
+    + Fore.WHITE
+    + Style.BRIGHT
+    + "{root}"
+    + Style.NORMAL
+    + Fore.RED
+    + " to be diffed."
+    + RS
+)
+
+warn_dump_chunk_retry = (
+    Fore.YELLOW
+    + indent_line
+    + "[Warn]"
+    + Fore.RESET
+    + " Fetching failed, retrying ({attempt}/{retries})..."
+    + RS
+)
+
+warn_channel_playlist_failed = (
+    Fore.YELLOW
+    + indent_line
+    + "[Warn]"
+    + Fore.RESET
+    + " Could not fetch playlist "
+    + Style.BRIGHT
+    + "{id}"
+    + Style.NORMAL
+    + " after {retries} attempts, skipping it. Run the same command again to retry."
+    + RS
+)
+
 warn_archive_dates_wrong_order = (
     Fore.YELLOW
     + Style.NORMAL
@@ -327,6 +577,132 @@ message_dump_fetching_playlist = (
     + RS
 )
 
+message_dump_checkpoint_stale = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Discarding "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ", left by a dump interrupted too long ago to be resumed."
+    + RS
+)
+
+message_dump_resuming = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Resuming interrupted dump, "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " video(s) already fetched."
+    + RS
+)
+
+message_dump_chunk_fetched = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Fetched "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " video(s)..."
+    + RS
+)
+
+message_dump_refreshed = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Playlist lined up with the base archive, "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{fetched}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " video(s) fetched, "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{reused}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " copied over."
+    + RS
+)
+
+message_dump_refresh_verify = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Base archive is the result of "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " incremental refreshes in a row, fetching the whole playlist to verify it."
+    + RS
+)
+
+message_dump_refresh_tail = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Playlist doesn't only grow at the head, fetching the rest of it rather than copying the base archive."
+    + RS
+)
+
+message_enrich_fetching = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Enriching "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " new video(s) ("
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{cached}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " already in cache)."
+    + RS
+)
+
+message_dump_fetch_time = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Fetched in "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{seconds:.2f}s"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
 message_dump_id_override = (
     Fore.BLUE
     + indent_line
@@ -373,6 +749,475 @@ message_dump_playlist_dumped = (
 )
 
 
+# ---------------------------------- CHANNEL --------------------------------- #
+
+channel_section = "\n" + Fore.BLUE + indent_arrow + Style.BRIGHT + "Channel" + RS
+
+message_channel_found_playlists = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Found "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " playlist(s) on channel"
+    + Fore.BLUE
+    + Style.BRIGHT
+    + " {id}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+message_channel_playlist_fetched = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Fetched playlist"
+    + Fore.BLUE
+    + Style.BRIGHT
+    + " {id}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " ("
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " video(s))."
+    + RS
+)
+
+message_channel_playlist_dumped = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Playlist dumped to "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+message_channel_index_written = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Channel index written to "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ".\n"
+    + RS
+)
+
+
+# --------------------------------- SCHEDULER -------------------------------- #
+
+message_scheduler_saved = (
+    Fore.BLUE
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Learned "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{rate:.1f}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " request(s)/s and "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{limit:.0f}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " in flight for "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{host}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ", saved to "
+    + Fore.BLUE
+    + Style.BRIGHT
+    + "{path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+# ---------------------------------- STAND-IN -------------------------------- #
+
+standin_section = "\n" + Fore.MAGENTA + indent_arrow + Style.BRIGHT + "Stand-in" + RS
+
+message_standin_serving = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Serving "
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " playlist(s) on"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {url}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ", press Ctrl+C to stop."
+    + RS
+)
+
+
+# ----------------------------------- STATS ---------------------------------- #
+
+stats_section = "\n" + Fore.CYAN + indent_arrow + Style.BRIGHT + "Stats" + RS
+
+message_stats_streamed = (
+    Fore.CYAN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Streamed "
+    + Fore.CYAN
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " snapshot(s) of"
+    + Fore.CYAN
+    + Style.BRIGHT
+    + " {id}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ", from "
+    + Style.BRIGHT
+    + "{first}"
+    + Style.NORMAL
+    + " to "
+    + Style.BRIGHT
+    + "{last}"
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+message_stats_top_channels = (
+    Fore.CYAN + indent_line + Style.NORMAL + Fore.WHITE + "Top {count} channel(s) by lost videos :" + RS
+)
+
+message_stats_exported = (
+    Fore.CYAN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Exported to "
+    + Fore.CYAN
+    + Style.BRIGHT
+    + "{path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+
+# ----------------------------------- BATCH ---------------------------------- #
+
+batch_section = "\n" + Fore.CYAN + indent_arrow + Style.BRIGHT + "Batch diff" + RS
+
+message_batch_diffed = (
+    Fore.CYAN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Diffed "
+    + Style.BRIGHT
+    + "{playlists}"
+    + Style.NORMAL
+    + " playlist(s) at once, "
+    + Style.BRIGHT
+    + "{rows}"
+    + Style.NORMAL
+    + " row(s) read. "
+    + Style.BRIGHT
+    + "{skipped}"
+    + Style.NORMAL
+    + " playlist(s) with a single snapshot were skipped."
+    + RS
+)
+
+# ---------------------------------- COMPACT --------------------------------- #
+
+compact_section = "\n" + Fore.CYAN + indent_arrow + Style.BRIGHT + "Compact" + RS
+
+message_compacted = (
+    Fore.CYAN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Compacted "
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + " archive(s) into "
+    + Style.BRIGHT
+    + "{rows}"
+    + Style.NORMAL
+    + " video(s), saved to"
+    + Fore.CYAN
+    + Style.BRIGHT
+    + " {path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ".\n"
+    + RS
+)
+
+# ----------------------------------- SERVE ---------------------------------- #
+
+serve_section = "\n" + Fore.MAGENTA + indent_arrow + Style.BRIGHT + "Serve" + RS
+
+message_serve_indexed = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Indexed "
+    + Style.BRIGHT
+    + "{archives}"
+    + Style.NORMAL
+    + " archive(s) of "
+    + Style.BRIGHT
+    + "{playlists}"
+    + Style.NORMAL
+    + " playlist(s), "
+    + Style.BRIGHT
+    + "{videos}"
+    + Style.NORMAL
+    + " video(s) known."
+    + RS
+)
+
+message_serve_listening = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Listening on"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {url}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ", press Ctrl+C to stop."
+    + RS
+)
+
+message_serve_refreshed = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Indexed "
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + " new archive(s)."
+    + RS
+)
+
+# -------------------------------- BENCH LOAD -------------------------------- #
+
+bench_section = "\n" + Fore.CYAN + indent_arrow + Style.BRIGHT + "Loading benchmark" + RS
+
+message_bench_loading = (
+    Fore.CYAN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Loading "
+    + Fore.CYAN
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " archive(s) with 1 to "
+    + Style.BRIGHT
+    + "{jobs}"
+    + Style.NORMAL
+    + " worker(s)..."
+    + RS
+)
+
+header_jobs = Fore.CYAN + Style.BRIGHT + "Workers" + RS
+header_seconds = Fore.WHITE + Style.BRIGHT + "Time (s)" + RS
+header_rows_per_second = Fore.WHITE + Style.BRIGHT + "Rows/s" + RS
+header_speedup = Fore.GREEN + Style.BRIGHT + "Speedup" + RS
+
+# ---------------------------------- VERIFY ---------------------------------- #
+
+verify_section = "\n" + Fore.GREEN + indent_arrow + Style.BRIGHT + "Verify" + RS
+
+message_verify_failed = (
+    Fore.GREEN
+    + indent_line
+    + Fore.RED
+    + Style.BRIGHT
+    + "{path}"
+    + Style.NORMAL
+    + Fore.WHITE
+    + " : {problem}."
+    + RS
+)
+
+verify_problem_rows = "{found} row(s) instead of {expected}, the archive is truncated or was edited"
+verify_problem_checksum = "checksum mismatch, the archive was altered"
+verify_problem_unreadable = "not a readable archive, or its header is incomplete"
+
+message_verify_done = (
+    Fore.GREEN
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Verified "
+    + Fore.GREEN
+    + Style.BRIGHT
+    + "{count}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " archive(s) : "
+    + Style.BRIGHT
+    + "{ok}"
+    + Style.NORMAL
+    + " ok, "
+    + Style.BRIGHT
+    + "{unchecked}"
+    + Style.NORMAL
+    + " without checksum, "
+    + Fore.RED
+    + Style.BRIGHT
+    + "{corrupt}"
+    + Style.NORMAL
+    + " corrupt"
+    + Fore.WHITE
+    + "."
+    + RS
+)
+
+
+# ------------------------------- KNOWLEDGE BASE ------------------------------ #
+
+kb_section = "\n" + Fore.MAGENTA + indent_arrow + Style.BRIGHT + "Knowledge base" + RS
+
+message_kb_building = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Ingesting new archives from"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + "."
+    + RS
+)
+
+message_kb_built = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Ingested "
+    + Style.BRIGHT
+    + "{ingested}"
+    + Style.NORMAL
+    + " archive(s), "
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + " video(s) known in total. Saved to"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + ".\n"
+    + RS
+)
+
+message_kb_watching = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Watching"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " for new archives ({backend}), press Ctrl+C to stop."
+    + RS
+)
+
+message_kb_updated = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Ingested "
+    + Style.BRIGHT
+    + "{ingested}"
+    + Style.NORMAL
+    + " new archive(s), "
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + " video(s) known in total."
+    + RS
+)
+
+message_kb_loaded = (
+    Fore.MAGENTA
+    + indent_line
+    + Style.NORMAL
+    + Fore.WHITE
+    + "Loaded knowledge base"
+    + Fore.MAGENTA
+    + Style.BRIGHT
+    + " {path}"
+    + Fore.WHITE
+    + Style.NORMAL
+    + " ("
+    + Style.BRIGHT
+    + "{count}"
+    + Style.NORMAL
+    + " video(s))."
+    + RS
+)
+
+
 # ---------------------------------------------------------------------------- #
 #                                   ANALYSIS                                   #
 # ---------------------------------------------------------------------------- #
@@ -417,6 +1262,17 @@ header_category = Fore.WHITE + Style.BRIGHT + "Category" + RS
 header_title = Fore.WHITE + Style.BRIGHT + "Title" + RS
 header_channel = Fore.WHITE + Style.BRIGHT + "Channel" + RS
 header_url = Fore.WHITE + Style.BRIGHT + "Channel URL" + RS
+header_month = Fore.CYAN + Style.BRIGHT + "Month" + RS
+header_added = Fore.GREEN + Style.BRIGHT + "Added" + RS
+header_removed = Fore.WHITE + Style.BRIGHT + "Removed" + RS
+header_lost = Fore.RED + Style.BRIGHT + "Lost" + RS
+header_restored = Fore.GREEN + Style.BRIGHT + "Restored" + RS
+header_unavailable = Fore.YELLOW + Style.BRIGHT + "Unavailable" + RS
+header_change = Fore.CYAN + Style.BRIGHT + "Change" + RS
+header_count = Fore.WHITE + Style.BRIGHT + "Videos" + RS
+header_yt_id = Fore.WHITE + Style.BRIGHT + "YouTube ID" + RS
+header_from = Fore.WHITE + Style.BRIGHT + "From" + RS
+header_to = Fore.WHITE + Style.BRIGHT + "To" + RS
 category_al = "AL"
 category_nl = Fore.YELLOW + "NL" + RS
 legend_al = "This video is currently lost, and already was in the older archive provided."
@@ -0,0 +1,127 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Pipelined upstream diff for the script. Local archive + YouTube playlist --> lost videos, ready when the fetch is.
+
+Fetching is network-bound and takes far longer than anything else, so the base archive is parsed and indexed in a
+background thread meanwhile. Each video is then classified as soon as `yt_dlp` yields it, rather than once the whole
+playlist has been rendered as an archive and parsed back.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import contextlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Should be safe as long as the script is distributed as a zipapp
+import diff
+import dump
+import lazy
+
+# ------------------------------------- . ------------------------------------ #
+
+
+def _load(path: str) -> tuple[dict, dict]:
+    """Read the base archive and index it. Runs in the background.
+
+    Args:
+        path (str): Path to the archive.
+
+    Returns:
+        tuple[dict, dict]: The archive as returned by `lazy.read`, and its index as built by `diff._index`.
+    """
+    base = lazy.read(path)
+
+    return (base, diff._index(base))
+
+
+class Classifier:
+    """Look up lost videos in the base archive as they are fetched, i.e. `diff._collect` and `diff._compare` in one go.
+
+    Videos lost before the base archive is ready are held back, and looked up as soon as it is.
+    """
+
+    def __init__(self, base: Future):
+        """
+        Args:
+            base (Future): Will hold the output of `_load`.
+        """
+        self._base = base
+        self.base = None
+        self._index = None
+        # YouTube ID --> index in the playlist, lost videos waiting for the base archive
+        self._pending = {}
+        # Same format as `diff._compare`, in playlist order
+        self.recovered = {}
+
+    def _ready(self) -> bool:
+        """Whether the base archive is indexed, looking up the pending videos once it is."""
+        if (self._index is None) and self._base.done():
+            self.base, self._index = self._base.result()
+            for lost, yt_index in self._pending.items():
+                self.recovered[lost] = diff._lookup(self.base, self._index, lost, yt_index)
+            self._pending = {}
+
+        return self._index is not None
+
+    def add(self, i: int, entry: "dump.Entry"):
+        """Classify one upstream video, see `dump._get_playlist_from_yt`.
+
+        Args:
+            i (int): Index of the video in the playlist, starting at 1.
+            entry (dump.Entry): The video.
+        """
+        # Retried chunks report videos again, and availability may have changed in between
+        if not entry.unavailable:
+            self._pending.pop(entry.id, None)
+            self.recovered.pop(entry.id, None)
+            return
+
+        # Indexes are strings, like the ones of `diff._collect`
+        if self._ready():
+            self.recovered[entry.id] = diff._lookup(self.base, self._index, entry.id, str(i))
+        else:
+            self._pending[entry.id] = str(i)
+
+    def result(self) -> tuple[dict, dict]:
+        """Wait for the base archive, if it somehow took longer than the fetch.
+
+        Returns:
+            tuple[dict, dict]: The base archive, and the lost videos in the format of `diff._compare`.
+        """
+        self._base.result()
+        self._ready()
+
+        return (self.base, self.recovered)
+
+
+def up_diff(base_path: str, playlist_id: str, browser: str = None) -> tuple[dict, dict, dict]:
+    """Fetch a playlist and look up its lost videos in a local archive, both at once.
+
+    Args:
+        base_path (str): Path to the local archive.
+        playlist_id (str): YouTube ID of the playlist.
+        browser (str, optional): Browser to use as specified in https://github.com/yt-dlp/yt-dlp/blob/master/yt_dlp/YoutubeDL.py#L336C5-L336C23. Defaults to None.
+
+    Returns:
+        tuple[dict, dict, dict]: The local archive (see `lazy.read`, and `lazy.close` once done with it), the metadata of the upstream one, and the lost videos. Pass them on to `diff.diff`.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        loading = executor.submit(_load, base_path)
+        classifier = Classifier(loading)
+        try:
+            upstream_dump, _ = dump.dump(playlist_id, browser=browser, on_entry=classifier.add)
+        except BaseException:
+            # Nothing will read the base archive now that the fetch failed
+            with contextlib.suppress(Exception):
+                lazy.close(loading.result()[0])
+            raise
+        base, recovered = classifier.result()
+
+    upstream_dump.seek(0)  # Reset the cursor to read from the beginning
+
+    return (base, diff.read_header(upstream_dump), recovered)
+
+
+# ------------------------------------- . ------------------------------------ #
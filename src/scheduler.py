@@ -0,0 +1,300 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Fetch scheduler for the script. Paces every request `yt_dlp` sends, so that fetching as fast as YouTube allows doesn't
+get us throttled, let alone blocked.
+
+Each host gets its own budget :
+    * A token bucket caps the request rate.
+    * A concurrency limit caps the requests in flight, below the number of threads fetching.
+Both adapt AIMD-style (additive increase, multiplicative decrease) : they slowly grow as long as requests go through,
+and are cut down as soon as the host throttles us (429 / 503, honouring `Retry-After`) or responses get slow.
+Throttled requests are retried here, rather than failing the whole page walk.
+
+What was learned can be saved, and used as the starting point of the next run.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import json
+import time
+import functools
+import threading
+import contextlib
+import urllib.parse
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import archive
+
+try:
+    from yt_dlp.networking.exceptions import HTTPError, TransportError
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`yt-dlp`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Bump this whenever the layout of the state file changes
+STATE_VERSION = 1
+# Requests per second allowed at first, per host, when nothing was learned yet
+FETCH_RATE = 5.0
+# Requests per second never exceeded, per host, unless a budget says otherwise
+MAX_RATE = 50.0
+# Requests per second never gone below, however hard we get throttled
+MIN_RATE = 0.1
+# Requests per second gained for each second's worth of requests that went through
+RATE_STEP = 1.0
+# Rate and concurrency are multiplied by that much when a host pushes back
+DECREASE = 0.5
+# Seconds worth of requests that can be sent in a burst
+BURST = 1.0
+# Responses slower than that many seconds mean the host is struggling
+SLOW_RESPONSE = 5.0
+# Status codes meaning "slow down"
+THROTTLE_STATUS = (429, 503)
+# Number of times a throttled request is retried before giving up
+THROTTLE_RETRIES = 5
+# Seconds to wait after being throttled, when the host doesn't say
+RETRY_AFTER = 1.0
+
+
+def budget(value: str) -> tuple[str, float]:
+    """Parse a per-host budget from the command line, e.g. `www.youtube.com=2`.
+
+    Args:
+        value (str): Host and maximum number of requests per second, separated by `=`.
+
+    Returns:
+        tuple[str, float]: The host, and its maximum rate.
+    """
+    host, _, rate = value.rpartition("=")
+    if (host == "") or (float(rate) <= 0):
+        raise ValueError(value)
+
+    return (host, float(rate))
+
+
+def _retry_after(error: "HTTPError") -> float:
+    """Seconds the host asked us to wait for, see `Retry-After`. Only the delay form is supported."""
+    with contextlib.suppress(AttributeError, TypeError, ValueError):
+        return max(0.0, float(error.response.headers.get("Retry-After")))
+
+    return RETRY_AFTER
+
+
+class _Host:
+    """Budget of one host. Every method is thread safe."""
+
+    def __init__(self, name: str, rate: float, limit: float, max_rate: float, max_limit: int):
+        self.name = name
+        self.max_rate = max_rate
+        self.max_limit = max_limit
+        self.rate = min(max(rate, MIN_RATE), max_rate)
+        self.limit = min(max(limit, 1.0), max_limit)
+        self.tokens = 1.0
+        self.in_flight = 0
+        # No request until then, the host asked for it
+        self.blocked_until = 0.0
+        # Only requests sent after the last decrease can trigger another one
+        self.last_decrease = 0.0
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(max(1.0, self.rate * BURST), self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self) -> float:
+        """Block until a request can be sent.
+
+        Returns:
+            float: When the request was allowed to go (`time.monotonic`), to be handed back to `release`.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    self._cond.wait(self.blocked_until - now)
+                elif self.in_flight >= int(self.limit):
+                    # Woken up by `release`
+                    self._cond.wait()
+                elif self.tokens < 1.0:
+                    self._cond.wait((1.0 - self.tokens) / self.rate)
+                else:
+                    self.tokens -= 1.0
+                    self.in_flight += 1
+                    return now
+
+    def release(self, start: float, throttled: bool = False, retry_after: float = 0.0):
+        """Report how a request went, and adapt the budget.
+
+        Args:
+            start (float): As returned by `acquire`.
+            throttled (bool, optional): Whether the host pushed back. Defaults to False.
+            retry_after (float, optional): Seconds the host asked us to wait for. Defaults to 0.0.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            slow = (now - start) > SLOW_RESPONSE
+
+            if throttled or slow:
+                # One decrease per round of requests, the ones already in flight were sent too fast as well
+                if start >= self.last_decrease:
+                    self.limit = max(1.0, self.limit * DECREASE)
+                    # Slow responses mean too many requests at once, not necessarily too many per second
+                    if throttled:
+                        self.rate = max(MIN_RATE, self.rate * DECREASE)
+                        self.tokens = min(self.tokens, 0.0)
+                    self.last_decrease = now
+                if throttled:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+            else:
+                # Only grow what actually held us back, otherwise an idle budget would grow unchecked
+                self._refill(now)
+                if self.tokens < 1.0:
+                    self.rate = min(self.max_rate, self.rate + RATE_STEP / self.rate)
+                if self.in_flight + 1 >= int(self.limit):
+                    self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+            self._cond.notify_all()
+
+
+class Scheduler:
+    """Shared by every `yt_dlp` session of a run, see `install`."""
+
+    def __init__(
+        self,
+        state_path: str = None,
+        jobs: int = 1,
+        rate: float = FETCH_RATE,
+        max_rate: float = MAX_RATE,
+        budgets: dict[str, float] = None,
+    ):
+        """
+        Args:
+            state_path (str, optional): Path to the state file (JSON), where learned rates are read from and saved to. Defaults to None, i.e. start from `rate` every time.
+            jobs (int, optional): Maximum number of requests in flight per host, typically the number of threads fetching. Defaults to 1.
+            rate (float, optional): Requests per second allowed at first, for hosts the state file doesn't know about. Defaults to `FETCH_RATE`.
+            max_rate (float, optional): Requests per second never exceeded, per host. Defaults to `MAX_RATE`.
+            budgets (dict[str, float], optional): Maximum requests per second of specific hosts, overriding `max_rate`. Defaults to None.
+        """
+        self.state_path = state_path
+        self.jobs = max(1, jobs)
+        self.rate = rate
+        self.max_rate = max_rate
+        self.budgets = budgets or {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._learned = self.load()
+
+    def load(self) -> dict:
+        """Read the state file.
+
+        Returns:
+            dict: Host names as keys, and what was learned about them ("rate", "limit") as values. Empty if there is no (valid) state file.
+        """
+        if self.state_path is None:
+            return {}
+
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        return state.get("hosts", {}) if (state.get("version") == STATE_VERSION) else {}
+
+    def save(self):
+        """Write what was learned to the state file, along with the hosts of previous runs."""
+        if self.state_path is None:
+            return
+
+        with self._lock:
+            hosts = {**self._learned}
+            for name, host in self._hosts.items():
+                hosts[name] = {"rate": round(host.rate, 3), "limit": round(host.limit, 3)}
+
+        archive.write_atomic(
+            self.state_path, json.dumps({"version": STATE_VERSION, "hosts": hosts}, indent=1)
+        )
+
+        for host in self.hosts():
+            print(
+                txt.message_scheduler_saved.format(
+                    rate=host.rate, limit=int(host.limit), host=host.name, path=self.state_path
+                )
+            )
+
+    def host(self, name: str) -> _Host:
+        """Budget of a host, created on first use."""
+        with self._lock:
+            host = self._hosts.get(name)
+            if host is None:
+                learned = self._learned.get(name, {})
+                host = _Host(
+                    name,
+                    rate=learned.get("rate", self.rate),
+                    # Start from the learned concurrency, but never above what this run can do
+                    limit=learned.get("limit", 1.0),
+                    max_rate=self.budgets.get(name, self.max_rate),
+                    max_limit=self.jobs,
+                )
+                self._hosts[name] = host
+
+            return host
+
+    def hosts(self) -> list[_Host]:
+        """Every host requests were sent to so far."""
+        with self._lock:
+            return list(self._hosts.values())
+
+    def urlopen(self, urlopen, req):
+        """Stand-in for `yt_dlp.YoutubeDL.urlopen`, see `install`.
+
+        Args:
+            urlopen (callable): The original `urlopen` of the session.
+            req (str | yt_dlp.networking.Request): The request.
+
+        Returns:
+            yt_dlp.networking.Response: The response.
+        """
+        url = req if isinstance(req, str) else req.url
+        host = self.host(urllib.parse.urlparse(url).hostname or "")
+
+        for attempt in range(THROTTLE_RETRIES + 1):
+            start = host.acquire()
+            try:
+                response = urlopen(req)
+            except HTTPError as e:
+                throttled = e.status in THROTTLE_STATUS
+                host.release(start, throttled=throttled, retry_after=_retry_after(e) if throttled else 0.0)
+                if (not throttled) or (attempt == THROTTLE_RETRIES):
+                    raise
+                with contextlib.suppress(Exception):
+                    e.response.close()
+            except TransportError:
+                # Timeouts and dropped connections, most likely an overwhelmed host
+                host.release(start, throttled=True, retry_after=RETRY_AFTER)
+                raise
+            except BaseException:
+                host.release(start)
+                raise
+            else:
+                host.release(start)
+                return response
+
+    def install(self, ydl):
+        """Route every request of a `yt_dlp` session through the scheduler.
+
+        Args:
+            ydl (yt_dlp.YoutubeDL): The session.
+        """
+        ydl.urlopen = functools.partial(self.urlopen, ydl.urlopen)
+
+
+# ------------------------------------- . ------------------------------------ #
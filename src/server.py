@@ -0,0 +1,409 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Query service for the script. Archives are loaded once into in-memory indexes, and queried over a local HTTP/JSON API.
+
+Endpoints :
+    GET /playlists                                      Every playlist, with the dates of its snapshots.
+    GET /video/<video_id>                               Every playlist the video was seen in, and its last known metadata.
+    GET /playlist/<playlist_id>/diff?since=&until=      What changed between two snapshots, lost videos being looked up
+                                                        like `local-diff` does. `since` / `until` are dates (`YYYY-MM-DD`)
+                                                        or unix times, and default to the two latest snapshots.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import json
+import bisect
+import threading
+import urllib.parse
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+import loader
+import verify
+import watch
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Seconds between two looks for new archives on the disk
+REFRESH_INTERVAL = 30
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    """Cheap fingerprint used to tell whether a file changed since it was indexed, see `kb._stamp`."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _timestamp(value: str) -> float:
+    """Parse a date from a query string.
+
+    Args:
+        value (str): Either a date/datetime in ISO format, or a unix time in seconds or milliseconds.
+
+    Returns:
+        float: Unix time in seconds.
+    """
+    if value.isdigit():
+        return diff.unix_time(value)
+
+    return datetime.fromisoformat(value).timestamp()
+
+
+class Index:
+    """In-memory indexes over every archive found under a directory. Safe to query from several threads."""
+
+    def __init__(self, root: str, jobs: int = None):
+        self.root = root
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        # Held for a whole refresh, so that the watcher and the initial load never index the same archive twice
+        self._refreshing = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        # Path --> stamp, for every file looked at (compacted archives and non-archives are left out of the rest)
+        self.files = {}
+        # Path --> `loader.Columns`
+        self.archives = {}
+        # Path --> {YouTube ID --> first row}, for diffs
+        self.positions = {}
+        # Playlist ID --> sorted list of (unix time, path)
+        self.playlists = {}
+        # YouTube ID --> {playlist ID --> [first seen, last seen, last available, path, row]}
+        self.videos = {}
+
+    def _sight(self, video_id: str, playlist_id: str, date: float, path: str, i: int):
+        """Record that row `i` of archive `path` holds `video_id`. The caller holds the lock."""
+        available = not self.archives[path].unavailable[i]
+        sightings = self.videos.setdefault(video_id, {})
+        seen = sightings.get(playlist_id)
+        if seen is None:
+            sightings[playlist_id] = [date, date, date if available else None, path, i]
+            return
+
+        # Point at the most relevant row : the last available one if any, the last one otherwise
+        if available and ((seen[2] is None) or (date >= seen[2])):
+            seen[2], seen[3], seen[4] = date, path, i
+        elif (seen[2] is None) and (date >= seen[1]):
+            seen[3], seen[4] = path, i
+        seen[0] = min(seen[0], date)
+        seen[1] = max(seen[1], date)
+
+    def _add(self, columns: "loader.Columns", stamp: tuple[int, int]):
+        """Index one archive, unless it already is. The caller holds the lock."""
+        if columns.path in self.files:
+            return
+        # Known from now on, so that it isn't parsed again until it changes
+        self.files[columns.path] = stamp
+        try:
+            playlist_id = columns.header["playlist_id"]
+            date = diff.unix_time(columns.header["save_date"])
+        except (KeyError, ValueError):
+            return
+        # Spans many snapshots, it isn't one
+        if "compacted" in columns.header:
+            return
+
+        self.archives[columns.path] = columns
+        positions = self.positions[columns.path] = {}
+        bisect.insort(self.playlists.setdefault(playlist_id, []), (date, columns.path))
+
+        for i in range(len(columns)):
+            video_id = columns.id(i)
+            # Duplicates within an archive are only sighted once, see `_remove`
+            if video_id in positions:
+                continue
+            positions[video_id] = i
+            self._sight(video_id, playlist_id, date, columns.path, i)
+
+    def _remove(self, path: str):
+        """Drop one archive from the indexes, if it was indexed. The caller holds the lock.
+
+        Sightings of its videos are worked out again from the other snapshots of its playlist, the rest of the indexes
+        is left alone.
+        """
+        self.files.pop(path, None)
+        columns = self.archives.pop(path, None)
+        if columns is None:
+            return
+        positions = self.positions.pop(path)
+        playlist_id = columns.header["playlist_id"]
+
+        series = self.playlists[playlist_id]
+        series.remove((diff.unix_time(columns.header["save_date"]), path))
+        if len(series) == 0:
+            del self.playlists[playlist_id]
+
+        for video_id in positions:
+            sightings = self.videos[video_id]
+            del sightings[playlist_id]
+            for date, other in series:
+                i = self.positions[other].get(video_id)
+                if i is not None:
+                    self._sight(video_id, playlist_id, date, other, i)
+            if len(sightings) == 0:
+                del self.videos[video_id]
+
+    def refresh(self, paths: list[str] = None) -> int:
+        """Index new archives, and index modified ones again. Deleted archives are dropped.
+
+        Only the archives concerned are parsed, and only the playlists they belong to are looked at again.
+
+        Args:
+            paths (list[str], optional): Archives reported by `watch.Watcher`. Defaults to None, i.e. scan the whole directory.
+
+        Returns:
+            int: Number of archives indexed.
+        """
+        with self._refreshing:
+            stamps = {}
+            for path in verify.expand([self.root]) if (paths is None) else paths:
+                try:
+                    stamps[path] = _stamp(path)
+                except OSError:
+                    continue
+
+            with self._lock:
+                # `dump` (to an existing path) and `compact` rewrite archives in place
+                todo = [path for (path, stamp) in stamps.items() if self.files.get(path) != stamp]
+                if paths is None:
+                    gone = [path for path in self.files if path not in stamps]
+                else:
+                    # The watcher may report a directory moved away instead of the archives it held
+                    reported = set(paths)
+                    directories = tuple(path + os.sep for path in reported if path not in self.files)
+                    gone = [
+                        path
+                        for path in self.files
+                        if (path not in stamps) and ((path in reported) or path.startswith(directories))
+                    ]
+
+            # Parsing happens outside the lock, queries keep being answered meanwhile
+            loaded = [columns for columns in loader.load(todo, jobs=self.jobs) if (columns is not None)]
+
+            with self._lock:
+                # Previous versions of modified archives go too, even if they can't be parsed anymore
+                for path in gone + todo:
+                    self._remove(path)
+                for columns in loaded:
+                    self._add(columns, stamps[columns.path])
+
+            return len(loaded)
+
+    def watch(self, interval: float = REFRESH_INTERVAL) -> "watch.Watcher":
+        """Keep the indexes up to date in a background thread, as archives land in the directory.
+
+        Args:
+            interval (float, optional): Seconds between two scans, if the directory has to be polled. Defaults to `REFRESH_INTERVAL`.
+
+        Returns:
+            watch.Watcher: Call its `stop` method to stop watching.
+        """
+        watcher = watch.Watcher(self.root, interval=interval)
+
+        def _loop():
+            for paths in watcher.batches():
+                indexed = self.refresh(paths)
+                if indexed > 0:
+                    print(txt.message_serve_refreshed.format(count=indexed))
+
+        threading.Thread(target=_loop, daemon=True).start()
+
+        return watcher
+
+    def list_playlists(self) -> dict:
+        """Every playlist indexed, with the dates of its snapshots."""
+        with self._lock:
+            return {
+                "playlists": [
+                    {
+                        "id": playlist_id,
+                        "snapshots": [
+                            datetime.fromtimestamp(date).isoformat(sep=" ") for (date, _) in series
+                        ],
+                    }
+                    for playlist_id, series in sorted(self.playlists.items())
+                ]
+            }
+
+    def video(self, video_id: str) -> dict | None:
+        """Every playlist `video_id` was seen in, and its last known metadata there. `None` if it was never seen."""
+        with self._lock:
+            sightings = self.videos.get(video_id)
+            if sightings is None:
+                return None
+
+            out = {"id": video_id, "playlists": []}
+            for playlist_id, (first, last, available, path, i) in sightings.items():
+                row = self.archives[path].row(i)
+                out["playlists"].append(
+                    {
+                        "playlist_id": playlist_id,
+                        "first_seen": datetime.fromtimestamp(first).isoformat(sep=" "),
+                        "last_seen": datetime.fromtimestamp(last).isoformat(sep=" "),
+                        "last_available": (
+                            datetime.fromtimestamp(available).isoformat(sep=" ")
+                            if (available is not None)
+                            else None
+                        ),
+                        "index": row[0],
+                        "title": row[5] if (available is not None) else None,
+                        "channel": row[3] if (available is not None) else None,
+                        "channel_url": row[4] if (available is not None) else None,
+                    }
+                )
+
+            return out
+
+    def diff(self, playlist_id: str, since: float = None, until: float = None) -> dict | None:
+        """Diff two snapshots of a playlist, the same way `diff.diff` does.
+
+        Args:
+            playlist_id (str): YouTube ID of the playlist.
+            since (float, optional): Unix time (s), the base is the last snapshot made at or before it. Defaults to None, i.e. the second to last snapshot.
+            until (float, optional): Unix time (s), diffed against the last snapshot made at or before it. Defaults to None, i.e. the last snapshot.
+
+        Returns:
+            dict | None: The changes, `None` if the playlist doesn't have two snapshots in that range.
+        """
+        with self._lock:
+            series = self.playlists.get(playlist_id, [])
+            dates = [date for (date, _) in series]
+            end = len(series) if (until is None) else bisect.bisect_right(dates, until)
+            start = (end - 1) if (since is None) else bisect.bisect_right(dates, since)
+            if (start < 1) or (end <= start):
+                return None
+            base_date, base = series[start - 1][0], self.archives[series[start - 1][1]]
+            against_date, against = series[end - 1][0], self.archives[series[end - 1][1]]
+            base_positions = self.positions[base.path]
+            against_positions = self.positions[against.path]
+
+        # Comparing is done outside the lock, archives are never modified once indexed. Only IDs and availability are
+        # looked at, rows are unpacked for the lost videos alone.
+        lost_ids = {}
+        for i in range(len(against)):
+            if against.unavailable[i]:
+                lost_ids[against.id(i)] = against.row(i)[0]
+        # Same rules as `local-diff`, against the index already built for the base
+        playlist = {"data": base.rows()}
+        recovered = {
+            lost: diff._lookup(playlist, base_positions, lost, yt_index)
+            for (lost, yt_index) in lost_ids.items()
+        }
+
+        return {
+            "playlist_id": playlist_id,
+            "base": datetime.fromtimestamp(base_date).isoformat(sep=" "),
+            "with": datetime.fromtimestamp(against_date).isoformat(sep=" "),
+            "added": [video_id for video_id in against_positions if video_id not in base_positions],
+            "removed": [video_id for video_id in base_positions if video_id not in against_positions],
+            "lost": [
+                {
+                    "id": video_id,
+                    "index": yt_index,
+                    # Same categories as `diff._analyse`
+                    "already_lost": found is True,
+                    "title": found[5] if (type(found) is not bool) else None,
+                    "channel": found[3] if (type(found) is not bool) else None,
+                    "channel_url": found[4] if (type(found) is not bool) else None,
+                }
+                for video_id, (yt_index, found) in recovered.items()
+            ],
+        }
+
+
+def _handler(index: Index) -> type:
+    """Build the request handler of the service.
+
+    Args:
+        index (Index): The indexes to query.
+
+    Returns:
+        type: The handler class, for `ThreadingHTTPServer`.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            # Keep the output clean
+            pass
+
+        def _send(self, status: int, body: dict):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/")]
+
+            try:
+                if parts == ["playlists"]:
+                    self._send(200, index.list_playlists())
+                elif (len(parts) == 2) and (parts[0] == "video"):
+                    out = index.video(parts[1])
+                    if out is not None:
+                        self._send(200, out)
+                    else:
+                        self._send(404, {"error": "unknown video"})
+                elif (len(parts) == 3) and (parts[0] == "playlist") and (parts[2] == "diff"):
+                    since = _timestamp(query["since"][0]) if ("since" in query) else None
+                    until = _timestamp(query["until"][0]) if ("until" in query) else None
+                    out = index.diff(parts[1], since, until)
+                    if out is not None:
+                        self._send(200, out)
+                    else:
+                        self._send(404, {"error": "not enough snapshots in range"})
+                else:
+                    self._send(404, {"error": "not found"})
+            except ValueError:
+                self._send(400, {"error": "invalid date"})
+
+    return Handler
+
+
+def serve(
+    root: str, host: str = "127.0.0.1", port: int = 8000, interval: float = REFRESH_INTERVAL, jobs: int = None
+):
+    """Index every archive under `root`, and answer queries until interrupted.
+
+    Args:
+        root (str): Directory containing the archives, searched recursively.
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8000.
+        interval (float, optional): Seconds between two looks for new archives, if the directory has to be polled. Defaults to `REFRESH_INTERVAL`.
+        jobs (int, optional): Number of worker processes parsing archives. Defaults to None, i.e. one per CPU.
+    """
+    index = Index(root, jobs=jobs)
+    # Start watching first, so that nothing landing during the initial load is missed
+    watcher = index.watch(interval)
+    index.refresh()
+    print(
+        txt.message_serve_indexed.format(
+            archives=len(index.archives), playlists=len(index.playlists), videos=len(index.videos)
+        )
+    )
+
+    with ThreadingHTTPServer((host, port), _handler(index)) as server:
+        print(txt.message_serve_listening.format(url=f"http://{host}:{server.server_port}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.stop()
+
+
+# ------------------------------------- . ------------------------------------ #
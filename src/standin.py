@@ -0,0 +1,321 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Local stand-in for YouTube, to load-test the fetch path of the script offline.
+
+Playlists recorded in CSV archives are served as paginated JSON, one page per request like YouTube's continuations,
+with configurable latency, bandwidth throttling and error injection. `StandinPlaylistIE` teaches `yt_dlp` to walk
+these pages, so that `dump` goes through the very same `extract_info` machinery as with YouTube.
+
+Endpoints :
+    GET /playlist?list=<playlist_id>                        First page, along with the playlist metadata.
+    GET /browse?list=<playlist_id>&continuation=<offset>    Next pages.
+    GET /watch?v=<video_id>                                 Full metadata of one video, for enrichment.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import csv
+import json
+import time
+import random
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+import dump
+
+try:
+    from yt_dlp.extractor.common import InfoExtractor
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`yt-dlp`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Number of videos per page, same as YouTube
+PAGE_SIZE = 100
+# Status code of injected errors
+ERROR_STATUS = 429
+
+
+class StandinPlaylistIE(InfoExtractor):
+    """`yt_dlp` extractor for playlists served by the stand-in. Pages are fetched lazily, one per continuation.
+
+    Videos (`/watch`) go through it too, so that a single extractor covers everything the script fetches.
+    """
+
+    IE_NAME = "standin"
+    _VALID_URL = r"https?://[^/]+/(?:playlist\?list=|watch\?v=)(?P<id>[^&]+)"
+
+    def _entries(self, url: str, page: dict, playlist_id: str):
+        while True:
+            yield from page["entries"]
+            if page.get("next") is None:
+                return
+            page = self._download_json(urllib.parse.urljoin(url, page["next"]), playlist_id, note=False)
+
+    def _real_extract(self, url: str) -> dict:
+        playlist_id = self._match_id(url)
+        # The first page carries the metadata, like the initial YouTube page does
+        page = self._download_json(url, playlist_id, note=False)
+        if "/watch?" in url:
+            return page
+
+        return self.playlist_result(
+            self._entries(url, page, playlist_id),
+            playlist_id,
+            page.get("title"),
+            playlist_count=page.get("count"),
+        )
+
+
+def _load_recording(path: str) -> dict:
+    """Load the playlists to serve.
+
+    Args:
+        path (str): A CSV archive, or a directory of them (searched recursively). The latest archive of each playlist wins.
+
+    Returns:
+        dict: Playlist IDs as keys, and a list of flat `yt_dlp`-like entries as values. Entries of enriched archives also carry "duration", "upload_date" and "description".
+
+    Raises:
+        ValueError: If a CSV file isn't a valid archive, with its path as the only argument.
+    """
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [
+            os.path.join(dir_path, file_name)
+            for dir_path, _, file_names in os.walk(path)
+            for file_name in file_names
+            if file_name.endswith(".csv")
+        ]
+
+    latest = {}
+    for archive_path in paths:
+        try:
+            with open(archive_path, "r", encoding="utf-8") as f:
+                archive = diff.read(f)
+            # Compacted archives hold videos long gone from the playlist, they only count if asked for explicitly
+            if ("compacted" in archive) and os.path.isdir(path):
+                continue
+            date = diff.unix_time(archive["save_date"])
+            if any(len(row) < 6 for row in archive["data"]):
+                raise ValueError(archive_path)
+            known = latest.get(archive["playlist_id"])
+        except (KeyError, ValueError, csv.Error) as e:
+            raise ValueError(archive_path) from e
+        if (known is None) or (known[0] < date):
+            latest[archive["playlist_id"]] = (date, archive)
+
+    return {
+        playlist_id: [
+            {
+                "_type": "url",
+                "ie_key": "Youtube",
+                "id": row[1],
+                "url": f"https://www.youtube.com/watch?v={row[1]}",
+                "title": row[5],
+                "channel": row[3],
+                "channel_url": row[4],
+                "thumbnails": [
+                    {
+                        "url": dump.NO_THUMBNAIL
+                        if (row[2] == "True")
+                        else f"https://i.ytimg.com/vi/{row[1]}/hqdefault.jpg"
+                    }
+                ],
+                # Only enriched archives have these, see `enrich.CSV_HEADER_EXTENSION`
+                **(
+                    {
+                        "duration": int(row[6]) if row[6].isdigit() else None,
+                        "upload_date": row[7] or None,
+                        "description": row[8],
+                    }
+                    if (len(row) >= 9)
+                    else {}
+                ),
+            }
+            for row in archive["data"]
+        ]
+        for playlist_id, (_, archive) in latest.items()
+    }
+
+
+def _handler(
+    playlists: dict,
+    page_size: int,
+    latency: float,
+    throttle: int,
+    error_rate: float,
+    error_status: int,
+    rate_limit: float = 0.0,
+) -> type:
+    """Build the request handler of the stand-in.
+
+    Args:
+        playlists (dict): Playlists to serve, see `_load_recording`.
+        page_size (int): Number of videos per page.
+        latency (float): Delay before answering each request, in seconds.
+        throttle (int): Maximum bandwidth per response, in bytes per second. 0 for unlimited.
+        error_rate (float): Probability of answering a request with `error_status`, between 0 and 1.
+        error_status (int): Status code of injected errors.
+        rate_limit (float, optional): Requests per second answered with `error_status` past that, across all clients, like YouTube throttling. Defaults to 0.0, i.e. unlimited.
+
+    Returns:
+        type: The handler class, for `ThreadingHTTPServer`.
+    """
+    # YouTube ID --> entry, for `/watch`
+    videos = {entry["id"]: entry for entries in playlists.values() for entry in entries}
+    # Token bucket holding one second worth of requests, and at least one so that rates below 1 still let some through
+    capacity = max(1, rate_limit)
+    bucket = {"tokens": capacity, "stamp": time.monotonic()}
+    bucket_lock = threading.Lock()
+
+    def _admit() -> bool:
+        if rate_limit <= 0:
+            return True
+        with bucket_lock:
+            now = time.monotonic()
+            bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["stamp"]) * rate_limit)
+            bucket["stamp"] = now
+            if bucket["tokens"] < 1:
+                return False
+            bucket["tokens"] -= 1
+            return True
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            # Keep the output clean, the script prints its own summary
+            pass
+
+        def _send(self, status: int, body: dict):
+            payload = json.dumps(body).encode("utf-8")
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+
+            if throttle <= 0:
+                self.wfile.write(payload)
+                return
+            # Trickle the payload out in 10 slices per second
+            step = max(1, throttle // 10)
+            for start in range(0, len(payload), step):
+                self.wfile.write(payload[start : start + step])
+                self.wfile.flush()
+                time.sleep(0.1)
+
+        def do_GET(self):
+            time.sleep(latency)
+
+            if (random.random() < error_rate) or (not _admit()):
+                self._send(error_status, {"error": "injected"})
+                return
+
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+
+            if url.path == "/watch":
+                video = videos.get(query.get("v", [None])[0])
+                if video is None:
+                    self._send(404, {"error": "not found"})
+                    return
+                self._send(
+                    200,
+                    {
+                        "id": video["id"],
+                        "title": video["title"],
+                        "channel": video["channel"],
+                        "duration": video.get("duration"),
+                        "upload_date": video.get("upload_date"),
+                        "description": video.get("description"),
+                        # No actual media, but `yt_dlp` wants something to pick from
+                        "formats": [
+                            {
+                                "format_id": "standin",
+                                "url": f"http://{self.headers['Host']}/media/{video['id']}",
+                                "ext": "mp4",
+                            }
+                        ],
+                    },
+                )
+                return
+
+            playlist_id = query.get("list", [None])[0]
+            if (url.path not in ("/playlist", "/browse")) or (playlist_id not in playlists):
+                self._send(404, {"error": "not found"})
+                return
+
+            entries = playlists[playlist_id]
+            offset = int(query.get("continuation", ["0"])[0])
+            end = offset + page_size
+            page = {
+                "entries": entries[offset:end],
+                "next": (
+                    f"/browse?list={urllib.parse.quote(playlist_id)}&continuation={end}"
+                    if (end < len(entries))
+                    else None
+                ),
+            }
+            if url.path == "/playlist":
+                # Like the video count YouTube shows on the first page
+                page.update({"id": playlist_id, "title": playlist_id, "count": len(entries)})
+
+            self._send(200, page)
+
+    return Handler
+
+
+def serve(
+    recording: str,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    page_size: int = PAGE_SIZE,
+    latency: float = 0.0,
+    throttle: int = 0,
+    error_rate: float = 0.0,
+    error_status: int = ERROR_STATUS,
+    rate_limit: float = 0.0,
+):
+    """Serve recorded playlists until interrupted.
+
+    Args:
+        recording (str): A CSV archive, or a directory of them.
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8080.
+        page_size (int, optional): Number of videos per page. Defaults to `PAGE_SIZE`.
+        latency (float, optional): Delay before answering each request, in seconds. Defaults to 0.0.
+        throttle (int, optional): Maximum bandwidth per response, in bytes per second. Defaults to 0, i.e. unlimited.
+        error_rate (float, optional): Probability of answering a request with an error, between 0 and 1. Defaults to 0.0.
+        error_status (int, optional): Status code of injected errors. Defaults to `ERROR_STATUS`.
+        rate_limit (float, optional): Requests per second past which every request is answered with an error. Defaults to 0.0, i.e. unlimited.
+
+    Raises:
+        ValueError: If a CSV file under `recording` isn't a valid archive, with its path as the only argument.
+    """
+    playlists = _load_recording(recording)
+    handler = _handler(playlists, page_size, latency, throttle, error_rate, error_status, rate_limit)
+
+    with ThreadingHTTPServer((host, port), handler) as server:
+        print(
+            txt.message_standin_serving.format(
+                count=len(playlists), url=f"http://{host}:{server.server_port}"
+            )
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ------------------------------------- . ------------------------------------ #
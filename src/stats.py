@@ -0,0 +1,208 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Analytics service for the script. Streams the snapshot history of a playlist to tell how fast it rots.
+
+Snapshots are parsed a few at a time in worker processes (see `loader.load`) and consumed oldest first, only the state
+of the previous one is kept in memory.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import csv
+import json
+from datetime import datetime
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+import loader
+
+try:
+    import prettytable as pt
+except ModuleNotFoundError:
+    print(txt.err_generic_module_import.format(module="`prettytable`"))
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Number of channels shown in the summary (every channel is exported)
+TOP_CHANNELS = 10
+# Columns of each exported table, also the keys of the matching JSON objects
+SNAPSHOT_COLUMNS = ["archived_on", "total", "unavailable", "added", "removed", "lost", "restored"]
+MONTH_COLUMNS = ["month", "snapshots", "added", "removed", "lost", "restored", "unavailable"]
+CHANNEL_COLUMNS = ["channel", "channel_url", "lost"]
+
+
+def _load(paths: list[str], jobs: int = None):
+    """Parse snapshots with `loader.load`, along with their date.
+
+    Args:
+        paths (list[str]): Paths of the snapshots.
+        jobs (int, optional): See `loader.load`. Defaults to None.
+
+    Yields:
+        tuple[loader.Columns, datetime]: Each snapshot, and when it was made.
+
+    Raises:
+        ValueError: If a snapshot is malformed, with its path as the only argument.
+    """
+    loaded = loader.load(paths, jobs=jobs, strict=True)
+    for path in paths:
+        try:
+            columns = next(loaded)
+            date = datetime.fromtimestamp(diff.unix_time(columns.header["save_date"]))
+        except (KeyError, ValueError, csv.Error) as e:
+            raise ValueError(path) from e
+        yield (columns, date)
+
+
+def compute(paths: list[str], jobs: int = None) -> dict:
+    """Compute the time series of a playlist in a single pass over its snapshots.
+
+    The first snapshot only serves as a baseline, changes are counted from the second one onwards.
+    A video is "lost" when it goes from available to unavailable between two snapshots, and "restored" the other way around.
+
+    Args:
+        paths (list[str]): Paths of the snapshots, oldest first (see `archive.series` and `archive.snapshots`).
+        jobs (int, optional): Number of worker processes parsing snapshots ahead, see `loader.load`. Defaults to None, i.e. one per CPU.
+
+    Raises:
+        ValueError: If a snapshot is malformed, see `_load`.
+
+    Returns:
+        dict: Dictionary in the following format :
+                * "snapshots" (list[dict]): One entry per snapshot, see `SNAPSHOT_COLUMNS`.
+                * "months" (list[dict]): Snapshots aggregated by calendar month, see `MONTH_COLUMNS`.
+                * "channels" (list[dict]): Channels that lost videos, most affected first, see `CHANNEL_COLUMNS`.
+    """
+    snapshots = []
+    months = {}
+    # Channel URL --> [name, lost count]
+    channels = {}
+    # YouTube ID --> (is unavailable, channel, channel URL), for the previous snapshot only
+    previous = None
+
+    for columns, date in _load(paths, jobs=jobs):
+        current = {}
+        for i in range(len(columns)):
+            row = columns.row(i)
+            current[row[1]] = (row[2] == "True", row[3], row[4])
+
+        point = dict.fromkeys(SNAPSHOT_COLUMNS, 0)
+        point["archived_on"] = date.isoformat(sep=" ")
+        point["total"] = len(current)
+        point["unavailable"] = sum(1 for state in current.values() if state[0])
+
+        if previous is not None:
+            point["added"] = sum(1 for video_id in current if video_id not in previous)
+            point["removed"] = sum(1 for video_id in previous if video_id not in current)
+
+            for video_id, (unavailable, _, _) in current.items():
+                before = previous.get(video_id)
+                if (before is None) or (before[0] == unavailable):
+                    continue
+                if unavailable:
+                    point["lost"] += 1
+                    # Unavailable rows don't carry their channel anymore, the previous snapshot still does
+                    channel = channels.setdefault(before[2], [before[1], 0])
+                    channel[1] += 1
+                else:
+                    point["restored"] += 1
+
+        month = months.setdefault(date.strftime("%Y-%m"), dict.fromkeys(MONTH_COLUMNS, 0))
+        month["month"] = date.strftime("%Y-%m")
+        month["snapshots"] += 1
+        for key in ("added", "removed", "lost", "restored"):
+            month[key] += point[key]
+        # Unavailable videos as of the last snapshot of the month
+        month["unavailable"] = point["unavailable"]
+
+        snapshots.append(point)
+        previous = current
+
+    return {
+        "snapshots": snapshots,
+        "months": list(months.values()),
+        "channels": [
+            {"channel": name, "channel_url": url, "lost": lost}
+            for (url, (name, lost)) in sorted(channels.items(), key=lambda item: -item[1][1])
+        ],
+    }
+
+
+def export(stats: dict, path: str) -> list[str]:
+    """Export the output of `compute`.
+
+    Args:
+        stats (dict): Output of `compute`.
+        path (str): Destination. A `.json` path gets a single JSON file, any other path gets one CSV file per table, named after it (e.g. `rot.csv` --> `rot_snapshots.csv`, `rot_months.csv`, `rot_channels.csv`).
+
+    Returns:
+        list[str]: Paths of the files written.
+    """
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False, indent=1)
+        return [path]
+
+    stem = path.removesuffix(".csv")
+    written = []
+    for table, columns in (
+        ("snapshots", SNAPSHOT_COLUMNS),
+        ("months", MONTH_COLUMNS),
+        ("channels", CHANNEL_COLUMNS),
+    ):
+        table_path = f"{stem}_{table}.csv"
+        with open(table_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(stats[table])
+        written.append(table_path)
+
+    return written
+
+
+def summary(stats: dict, top: int = TOP_CHANNELS):
+    """Print the monthly aggregates and the channels that lost the most videos.
+
+    Args:
+        stats (dict): Output of `compute`.
+        top (int, optional): Number of channels to show. Defaults to `TOP_CHANNELS`.
+    """
+    months_table = pt.PrettyTable(padding_width=3)
+    months_table.set_style(pt.SINGLE_BORDER)
+    months_table.field_names = [
+        txt.header_month,
+        txt.header_added,
+        txt.header_removed,
+        txt.header_lost,
+        txt.header_restored,
+        txt.header_unavailable,
+    ]
+    for month in stats["months"]:
+        months_table.add_row(
+            [
+                month["month"],
+                month["added"],
+                month["removed"],
+                month["lost"],
+                month["restored"],
+                month["unavailable"],
+            ]
+        )
+    print(months_table)
+
+    if len(stats["channels"]) > 0:
+        channels_table = pt.PrettyTable(padding_width=3)
+        channels_table.set_style(pt.SINGLE_BORDER)
+        channels_table.field_names = [txt.header_channel, txt.header_url, txt.header_lost]
+        for channel in stats["channels"][:top]:
+            channels_table.add_row([channel["channel"], channel["channel_url"], channel["lost"]])
+        print(txt.message_stats_top_channels.format(count=min(top, len(stats["channels"]))))
+        print(channels_table)
+
+
+# ------------------------------------- . ------------------------------------ #
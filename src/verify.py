@@ -0,0 +1,138 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Integrity check service for the script. Archives carry their row count and checksum in their header, see `dump`.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Should be safe as long as the script is distributed as a zipapp
+import misc_text as txt
+import diff
+
+try:
+    from enum import Enum
+except ModuleNotFoundError:
+    print(txt.enum_import_error)
+    txt.error_handler()
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Archives are hashed in blocks of that many characters
+BLOCK_SIZE = 1 << 20
+
+
+class VerifyResult(Enum):
+    """See function `check`."""
+
+    OK = 1
+    UNCHECKED = 2
+    ROWS = 3
+    CHECKSUM = 4
+    UNREADABLE = 5
+
+
+def expand(paths: list[str]) -> list[str]:
+    """Replace directories with the CSV archives they contain (searched recursively).
+
+    Args:
+        paths (list[str]): Paths to archives and/or directories.
+
+    Returns:
+        list[str]: Paths to archives.
+    """
+    out = []
+    for path in paths:
+        if not os.path.isdir(path):
+            out.append(path)
+            continue
+        for dir_path, _, file_names in os.walk(path):
+            out.extend(
+                os.path.join(dir_path, file_name)
+                for file_name in sorted(file_names)
+                if file_name.endswith(".csv")
+            )
+
+    return out
+
+
+def check(path: str) -> tuple[str, VerifyResult, int, int]:
+    """Check one archive against the row count and checksum found in its header. Runs in a worker process.
+
+    Args:
+        path (str): Path to the archive.
+
+    Returns:
+        tuple[str, VerifyResult, int, int]: Path, outcome, and the expected and actual row counts. The outcome is :
+            * OK if both the row count and checksum match ;
+            * UNCHECKED if the archive predates checksums ;
+            * ROWS if the archive is truncated (or was otherwise shortened/lengthened) ;
+            * CHECKSUM if the rows are all there but something in them changed ;
+            * UNREADABLE if this isn't an archive at all, or its header is cut short or mangled.
+    """
+    # Whether the column names were found, i.e. the metadata is all there
+    complete = False
+
+    def _header_lines(f):
+        nonlocal complete
+        for line in f:
+            complete = line.startswith(diff.CSV_HEADER)
+            yield line
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = diff.read_header(_header_lines(f))
+
+            digest = hashlib.sha256()
+            rows = 0
+            for block in iter(lambda: f.read(BLOCK_SIZE), ""):
+                digest.update(block.encode("utf-8"))
+                rows += block.count("\n")
+    except (OSError, UnicodeDecodeError):
+        return (path, VerifyResult.UNREADABLE, 0, 0)
+
+    if ("playlist_id" not in header) or ("save_date" not in header) or (not complete):
+        return (path, VerifyResult.UNREADABLE, 0, rows)
+    if "rows" not in header:
+        return (path, VerifyResult.UNCHECKED, 0, rows)
+    # The row count is written right before the checksum, one without the other means the header is cut short
+    if "checksum" not in header:
+        return (path, VerifyResult.UNREADABLE, 0, rows)
+
+    try:
+        expected = int(header["rows"])
+    except ValueError:
+        return (path, VerifyResult.UNREADABLE, 0, rows)
+    if rows != expected:
+        return (path, VerifyResult.ROWS, expected, rows)
+    if "sha256:" + digest.hexdigest() != header["checksum"]:
+        return (path, VerifyResult.CHECKSUM, expected, rows)
+
+    return (path, VerifyResult.OK, expected, rows)
+
+
+def verify(paths: list[str], jobs: int = None) -> list[tuple[str, VerifyResult, int, int]]:
+    """Check many archives in parallel.
+
+    Args:
+        paths (list[str]): Paths to archives and/or directories containing archives.
+        jobs (int, optional): Number of worker processes. Defaults to None, i.e. one per CPU.
+
+    Returns:
+        list[tuple[str, VerifyResult, int, int]]: Output of `check` for each archive, in order.
+    """
+    paths = expand(paths)
+    if len(paths) == 0:
+        return []
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(check, paths, chunksize=8))
+
+
+# ------------------------------------- . ------------------------------------ #
@@ -0,0 +1,271 @@
+# Source : https://github.com/vitto4/yt-playlist-diff
+"""
+Filesystem watcher for the script. Reports archives created, modified or removed under a directory, so that indexes
+built over it (see `kb` and `server`) only ever ingest (or drop) what changed.
+
+On Linux, inotify is used through `ctypes`. Anywhere else (or if inotify is unavailable), the directory tree is polled
+with `os.scandir`, comparing modification times and sizes.
+
+Events are debounced : a file is only reported once it hasn't changed for `debounce` seconds, so that an archive
+being written (or several archives landing at once) ends up in a single batch. Batches go through a bounded queue,
+and the watcher waits for the consumer whenever it falls behind.
+"""
+
+# ---------------------------------------------------------------------------- #
+#                                 IMPORT LOGIC                                 #
+# ---------------------------------------------------------------------------- #
+
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+import contextlib
+
+# ------------------------------------- . ------------------------------------ #
+
+
+# Seconds a file must stay untouched before being reported
+DEBOUNCE = 2.0
+# Seconds between two scans of the directory tree, when polling
+POLL_INTERVAL = 5.0
+# Batches waiting for the consumer before the watcher blocks
+QUEUE_SIZE = 16
+
+# See `man 7 inotify`
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_archive(name: str) -> bool:
+    """Whether a file name is the one of an archive, leaving out temporary files and checkpoints (dotfiles)."""
+    return name.endswith(".csv") and (not name.startswith("."))
+
+
+def _scan(root: str) -> dict:
+    """Stamp every archive under `root`.
+
+    Args:
+        root (str): Directory to scan, recursively.
+
+    Returns:
+        dict: Paths as keys, (modification time (ns), size) as values.
+    """
+    out = {}
+    directories = [root]
+    while len(directories) > 0:
+        try:
+            with os.scandir(directories.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif _is_archive(entry.name):
+                        stat = entry.stat()
+                        out[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Removed while scanning
+            continue
+
+    return out
+
+
+class _Inotify:
+    """Minimal recursive inotify binding. Raises `OSError` if inotify can't be used."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MOVED_FROM
+
+    def __init__(self, root: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.root = root
+        # Watch descriptor --> directory
+        self._dirs = {}
+        try:
+            for dir_path, _, _ in os.walk(root):
+                self._add(dir_path)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch", directory)
+        self._dirs[wd] = directory
+
+    def read(self, timeout: float) -> list[str]:
+        """Wait up to `timeout` seconds for events.
+
+        Returns:
+            list[str]: Archives created, written, moved in, deleted or moved out since the last call. A directory moved out
+                is reported as is, since the archives it held aren't known here.
+        """
+        if len(select.select([self.fd], [], [], timeout)[0]) == 0:
+            return []
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        out = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size : offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            # Events were dropped by the kernel, report everything and let the consumer sort it out
+            if mask & IN_Q_OVERFLOW:
+                out.extend(_scan(self.root).keys())
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if (mask & IN_CREATE) and (mask & IN_ISDIR):
+                # New shard or playlist directory, possibly with sub-directories created before the watch was set up.
+                # Watch them all first, then scan for anything written before the watches were in place.
+                with contextlib.suppress(OSError):
+                    for dir_path, _, _ in os.walk(path):
+                        self._add(dir_path)
+                out.extend(_scan(path).keys())
+            elif (mask & IN_MOVED_FROM) and (mask & IN_ISDIR):
+                # Archives deleted one by one are reported below, but a whole directory moved away only shows up here
+                out.append(path)
+            elif (mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM)) and _is_archive(
+                os.path.basename(path)
+            ):
+                out.append(path)
+
+        return out
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher:
+    """Watch a directory tree for new, modified or removed archives, in a background thread.
+
+    Usage :
+        watcher = Watcher("./archives")
+        for paths in watcher.batches():
+            ...
+    """
+
+    def __init__(
+        self,
+        root: str,
+        debounce: float = DEBOUNCE,
+        interval: float = POLL_INTERVAL,
+        queue_size: int = QUEUE_SIZE,
+        poll: bool = False,
+    ):
+        """
+        Args:
+            root (str): Directory to watch, recursively.
+            debounce (float, optional): Seconds a file must stay untouched before being reported. Defaults to `DEBOUNCE`.
+            interval (float, optional): Seconds between two scans, when polling. Defaults to `POLL_INTERVAL`.
+            queue_size (int, optional): Batches waiting for the consumer before the watcher blocks. Defaults to `QUEUE_SIZE`.
+            poll (bool, optional): Whether to poll even if inotify is available. Defaults to False.
+        """
+        self.root = root
+        self.debounce = debounce
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+
+        self._inotify = None
+        if not poll:
+            try:
+                self._inotify = _Inotify(root)
+            except (OSError, AttributeError):
+                # No inotify here (or no watches left), fall back on polling
+                self._inotify = None
+        # Baseline for polling, only what changes after this point is reported
+        self._stamps = _scan(root) if (self._inotify is None) else None
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def backend(self) -> str:
+        """Either "inotify" or "polling"."""
+        return "inotify" if (self._inotify is not None) else "polling"
+
+    def _changes(self, timeout: float) -> list[str]:
+        """Archives that changed since the last call, waiting up to `timeout` seconds."""
+        if self._inotify is not None:
+            return self._inotify.read(timeout)
+
+        self._stop.wait(timeout)
+        stamps = _scan(self.root)
+        changed = [path for (path, stamp) in stamps.items() if self._stamps.get(path) != stamp]
+        # Gone since the last scan
+        changed.extend(path for path in self._stamps if path not in stamps)
+        self._stamps = stamps
+
+        return changed
+
+    def _run(self):
+        # Path --> time of the last event
+        pending = {}
+        tick = self.interval if (self._inotify is None) else self.debounce / 2
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for path in self._changes(tick):
+                pending[path] = now
+
+            now = time.monotonic()
+            ready = sorted(path for (path, last) in pending.items() if (now - last) >= self.debounce)
+            if len(ready) == 0:
+                continue
+            for path in ready:
+                del pending[path]
+            # Blocks while the queue is full, events pile up (deduplicated) in the meantime
+            while not self._stop.is_set():
+                try:
+                    self.queue.put(ready, timeout=self.debounce)
+                    break
+                except queue.Full:
+                    continue
+
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def batches(self):
+        """Yield batches of changed archives, until `stop` is called.
+
+        Yields:
+            list[str]: Paths of archives created, modified or removed, each reported once per batch. Whether a path
+                still exists is for the consumer to check, a removed directory may be reported instead of its archives.
+        """
+        while not self._stop.is_set():
+            try:
+                yield self.queue.get(timeout=self.debounce)
+            except queue.Empty:
+                continue
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+
+
+# ------------------------------------- . ------------------------------------ #